@@ -29,7 +29,8 @@ def inventory_tracking_validator(history, scenario):
     # For this example, we just check that inventory is mentioned
     inventory_mentioned = 0
     for response in history.responses:
-        if "stock" in response.content.lower() or "remaining" in response.content.lower():
+        content = response.content.lower()
+        if "stock" in content or "remaining" in content:
             inventory_mentioned += 1
     return inventory_mentioned >= 2
 
@@ -4,6 +4,7 @@ This example demonstrates integration with a real LLM provider.
 Requires: pip install openai
 Set your OPENAI_API_KEY environment variable before running.
 """
+import asyncio
 import os
 from vendingbench.adapters.openai_adapter import OpenAIAdapter
 from vendingbench.core.conversation import ConversationManager
@@ -37,23 +38,33 @@ def run_with_openai():
         print("Install OpenAI package with: pip install openai")
         return
     
-    # Create and run basic scenario
+    # Create the scenarios and run them concurrently; each turn still waits
+    # on the previous one, but the two scenarios overlap their API latency
     print("="*60)
-    print("Running Basic Vending Machine Scenario")
+    print("Running Basic and Complex Vending Machine Scenarios")
     print("="*60 + "\n")
     
     scenario = create_basic_vending_scenario()
+    complex_scenario = create_complex_vending_scenario()
     manager = ConversationManager(llm)
     
-    print(f"Scenario: {scenario.config.name}")
-    print(f"Turns: {len(scenario)}\n")
+    for s in (scenario, complex_scenario):
+        print(f"Scenario: {s.config.name}")
+        print(f"Turns: {len(s)}\n")
     
-    # Run with verbose output
-    history = manager.run_scenario(scenario, verbose=True)
+    async def run_scenarios():
+        try:
+            return await manager.arun_scenarios([scenario, complex_scenario])
+        finally:
+            # Close the keep-alive connections before asyncio.run ends the loop
+            await llm.aclose()
+    
+    history, complex_history = asyncio.run(run_scenarios())
     
     # Evaluate
     evaluator = Evaluator()
     result = evaluator.evaluate(history, scenario)
+    complex_result = evaluator.evaluate(complex_history, complex_scenario)
     
     # Print results
     print("\n" + "="*60)
@@ -69,31 +80,19 @@ def run_with_openai():
         if not metric.passed and metric.details.get("missing"):
             print(f"  Missing: {metric.details['missing']}")
     
+    print("\n" + "="*60)
+    print("Complex Scenario Results")
+    print("="*60)
+    print(f"Pass Rate: {complex_result.calculate_pass_rate():.2%}")
+    print(f"Overall: {'PASSED' if complex_result.overall_passed else 'FAILED'}")
+    
     # Save results
     os.makedirs("results", exist_ok=True)
     save_conversation_history(history, "results/openai_basic_history.json")
     save_evaluation_result(result, "results/openai_basic_result.json")
+    save_conversation_history(complex_history, "results/openai_complex_history.json")
+    save_evaluation_result(complex_result, "results/openai_complex_result.json")
     print("\nResults saved to 'results/' directory")
-    
-    # Optionally run complex scenario
-    run_complex = input("\nRun complex scenario? (y/n): ").lower() == 'y'
-    if run_complex:
-        print("\n" + "="*60)
-        print("Running Complex Vending Machine Scenario")
-        print("="*60 + "\n")
-        
-        complex_scenario = create_complex_vending_scenario()
-        complex_history = manager.run_scenario(complex_scenario, verbose=True)
-        complex_result = evaluator.evaluate(complex_history, complex_scenario)
-        
-        print("\n" + "="*60)
-        print("Complex Scenario Results")
-        print("="*60)
-        print(f"Pass Rate: {complex_result.calculate_pass_rate():.2%}")
-        print(f"Overall: {'PASSED' if complex_result.overall_passed else 'FAILED'}")
-        
-        save_conversation_history(complex_history, "results/openai_complex_history.json")
-        save_evaluation_result(complex_result, "results/openai_complex_result.json")
 
 
 if __name__ == "__main__":
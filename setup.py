@@ -37,7 +37,12 @@ setup(
             "mypy>=1.0.0",
         ],
         "openai": ["openai>=1.0.0"],
+        "http2": ["h2>=4.0.0"],
         "anthropic": ["anthropic>=0.18.0"],
         "cohere": ["cohere>=4.0.0"],
+        "msgspec": ["msgspec>=0.18.0"],
+        "orjson": ["orjson>=3.3.0"],
+        "pcre2": ["pcre2>=0.6.0"],
+        "regex": ["regex>=2022.1.18"],
     },
 )
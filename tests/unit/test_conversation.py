@@ -1,6 +1,19 @@
 """Tests for conversation management."""
+import asyncio
+import json
+import sys
+from dataclasses import asdict
+from datetime import datetime
+from unittest.mock import Mock, patch
+
 import pytest
-from vendingbench.core.conversation import ConversationManager, ConversationHistory
+from vendingbench.core.conversation import (
+    ConversationManager,
+    ConversationHistory,
+    _trusted_generate,
+    arun_scenarios,
+)
+from vendingbench.core.llm_interface import LLMResponse
 from vendingbench.core.scenario import Scenario, ScenarioConfig
 from vendingbench.adapters.mock_llm import MockLLM
 
@@ -23,6 +36,35 @@ class TestConversationHistory:
         assert history.messages[0]["role"] == "user"
         assert history.messages[0]["content"] == "Hello"
     
+    def test_add_message_interns_role(self):
+        """Test that roles are interned."""
+        history = ConversationHistory()
+        history.add_message("".join(["us", "er"]), "Hello")
+        
+        assert history.messages[0]["role"] is sys.intern("user")
+    
+    def test_add_message_invalid(self):
+        """Test that invalid messages are rejected when added."""
+        history = ConversationHistory()
+        with pytest.raises(ValueError):
+            history.add_message("narrator", "Hello")
+        with pytest.raises(ValueError):
+            history.add_message("user", None)
+        assert history.messages == []
+    
+    def test_add_messages_bulk(self):
+        """Test adding several messages at once."""
+        history = ConversationHistory()
+        history.add_messages_bulk([("system", "Setup"), ("user", "Hello")])
+        assert history.messages == [
+            {"role": "system", "content": "Setup"},
+            {"role": "user", "content": "Hello"},
+        ]
+        
+        with pytest.raises(ValueError):
+            history.add_messages_bulk([("user", "Fine"), ("narrator", "Bad")])
+        assert len(history.messages) == 2
+    
     def test_add_response(self):
         """Test adding an LLM response."""
         from vendingbench.core.llm_interface import LLMResponse
@@ -36,6 +78,31 @@ class TestConversationHistory:
         assert len(history.messages) == 1
         assert history.messages[0]["role"] == "assistant"
     
+    def test_add_response_without_content(self):
+        """Test that a response with no content (tool call, refusal) is stored as empty."""
+        from vendingbench.core.llm_interface import LLMResponse
+        
+        history = ConversationHistory()
+        response = LLMResponse(content=None, model="test")
+        history.add_response(response)
+        
+        assert history.messages == [{"role": "assistant", "content": ""}]
+        assert history.responses[0] is response and response.content is None
+    
+    def test_trim(self):
+        """Test dropping the oldest messages while keeping the system prompt."""
+        history = ConversationHistory()
+        history.add_message("system", "Setup")
+        for i in range(4):
+            history.add_message("user", f"Message {i}")
+        
+        assert history.trim(3) == 2
+        assert [m["content"] for m in history.messages] == ["Setup", "Message 2", "Message 3"]
+        assert history.trim(3) == 0
+        
+        assert history.trim(1, keep_system=False) == 2
+        assert [m["content"] for m in history.messages] == ["Message 3"]
+    
     def test_get_messages(self):
         """Test getting messages."""
         history = ConversationHistory()
@@ -47,6 +114,50 @@ class TestConversationHistory:
         messages.append({"role": "user", "content": "Test"})
         assert len(history.messages) == 1
     
+    def test_messages_view(self):
+        """Test the read-only, non-copying messages view."""
+        history = ConversationHistory()
+        history.add_message("user", "Hello")
+        
+        view = history.messages_view()
+        assert len(view) == 1
+        assert view[0]["content"] == "Hello"
+        assert not hasattr(view, "append")
+        
+        history.add_message("user", "Again")
+        assert [m["content"] for m in view] == ["Hello", "Again"]
+        assert next(reversed(view))["content"] == "Again"
+    
+    def test_iter_contents(self):
+        """Test iterating message contents by role."""
+        from vendingbench.core.llm_interface import LLMResponse
+        
+        history = ConversationHistory()
+        history.add_message("user", "Hello")
+        history.add_response(LLMResponse(content="Hi", model="test"))
+        
+        assert list(history.iter_contents()) == ["Hello", "Hi"]
+        assert list(history.iter_contents("assistant")) == ["Hi"]
+    
+    def test_started_at_iso(self):
+        """Test that the ISO start time is cached and follows reassignment."""
+        history = ConversationHistory()
+        assert history.started_at_iso == history.started_at.isoformat()
+        assert history.started_at_iso is history.started_at_iso
+        
+        history.started_at = datetime(2024, 1, 2, 3, 4, 5)
+        assert history.to_dict()["started_at"] == "2024-01-02T03:04:05"
+    
+    def test_cache_is_not_a_field(self):
+        """Test that the ISO cache stays out of asdict, repr and equality."""
+        when = datetime(2024, 1, 2, 3, 4, 5)
+        history = ConversationHistory(started_at=when)
+        history.started_at_iso
+        
+        assert not any(name.startswith("_") for name in asdict(history))
+        assert "_started_at_iso" not in repr(history)
+        assert history == ConversationHistory(started_at=when)
+    
     def test_get_last_response(self):
         """Test getting last response."""
         from vendingbench.core.llm_interface import LLMResponse
@@ -74,6 +185,17 @@ class TestConversationHistory:
         assert "metadata" in result
         assert "started_at" in result
         assert result["num_turns"] == 0
+    
+    def test_history_to_json(self):
+        """Test serializing a history straight to JSON."""
+        from vendingbench.core.llm_interface import LLMResponse
+        
+        history = ConversationHistory()
+        history.add_message("user", "Hello")
+        history.add_response(LLMResponse(content="Hi", model="test"))
+        
+        assert json.loads(history.to_json()) == history.to_dict()
+        assert json.loads(history.responses[0].to_json()) == history.responses[0].to_dict()
 
 
 class TestConversationManager:
@@ -85,6 +207,74 @@ class TestConversationManager:
         manager = ConversationManager(llm)
         assert manager.llm is llm
     
+    def test_patch_manager_method(self):
+        """Test that methods can be patched on a manager instance."""
+        manager = ConversationManager(MockLLM())
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        
+        with patch.object(manager, "run_scenario", return_value="patched"):
+            assert manager.run_scenario(scenario) == "patched"
+        assert isinstance(manager.run_scenario(scenario), ConversationHistory)
+    
+    def test_generate_override_called(self):
+        """Test that a subclass overriding generate is still called."""
+        calls = []
+        
+        class RecordingLLM(MockLLM):
+            def generate(self, messages, *args, **kwargs):
+                calls.append(len(messages))
+                return super().generate(messages, *args, **kwargs)
+        
+        manager = ConversationManager(RecordingLLM())
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        scenario.add_user_input("Input 1")
+        
+        history = manager.run_scenario(scenario)
+        manager.continue_conversation(history, "Input 2")
+        assert calls == [1, 3]
+        
+        # Adapters that don't override generate take the trusted path
+        llm = MockLLM()
+        assert _trusted_generate(llm).__func__ is MockLLM.generate_trusted
+    
+    def test_instance_generate_patch_called(self, monkeypatch):
+        """Test that a generate replaced on the instance is called."""
+        llm = MockLLM(responses=["Real"])
+        manager = ConversationManager(llm)
+        fake = Mock(return_value=LLMResponse(content="Patched", model="mock"))
+        monkeypatch.setattr(llm, "generate", fake)
+        
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        scenario.add_user_input("Input 1")
+        
+        history = manager.run_scenario(scenario)
+        assert history.responses[0].content == "Patched"
+        assert fake.call_count == 1
+    
+    def test_continue_conversation_validates(self):
+        """Test that messages appended directly to a history are still validated."""
+        manager = ConversationManager(MockLLM())
+        history = ConversationHistory()
+        history.messages.append({"role": "narrator", "content": "Hi"})
+        
+        with pytest.raises(ValueError):
+            manager.continue_conversation(history, "Hello")
+    
+    def test_histories_own_their_messages(self):
+        """Test that histories run from one scenario don't share message dicts."""
+        manager = ConversationManager(MockLLM())
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        scenario.add_user_input("Card number 1234")
+        
+        first = manager.run_scenario(scenario)
+        second = manager.run_scenario(scenario)
+        [batched] = manager.run_scenarios_batched([scenario])
+        first.messages[0]["content"] = "[redacted]"
+        assert second.messages[0]["content"] == "Card number 1234"
+        assert batched.messages[0]["content"] == "Card number 1234"
+        history = asyncio.run(manager.arun_scenario(scenario))
+        assert history.messages[0]["content"] == "Card number 1234"
+    
     def test_run_scenario_simple(self):
         """Test running a simple scenario."""
         llm = MockLLM(responses=["Response 1", "Response 2"])
@@ -170,3 +360,70 @@ class TestConversationManager:
         captured = capsys.readouterr()
         assert "Turn 1" in captured.out
         assert "user_input" in captured.out
+    
+    def test_arun_scenario(self):
+        """Test running a scenario from a coroutine."""
+        llm = MockLLM(responses=["Response 1", "Response 2"])
+        manager = ConversationManager(llm)
+        
+        config = ScenarioConfig(name="test", description="Test", system_prompt="Prompt")
+        scenario = Scenario(config)
+        scenario.add_user_input("Input 1")
+        scenario.add_user_input("Input 2")
+        
+        history = asyncio.run(manager.arun_scenario(scenario))
+        
+        assert [r.content for r in history.responses] == ["Response 1", "Response 2"]
+        assert history.messages[0]["role"] == "system"
+        assert history.metadata["scenario_name"] == "test"
+    
+    def test_arun_scenarios(self):
+        """Test running several scenarios concurrently."""
+        llm = MockLLM()
+        manager = ConversationManager(llm)
+        
+        scenarios = []
+        for name in ("first", "second"):
+            scenario = Scenario(ScenarioConfig(name=name, description="Test"))
+            scenario.add_user_input(f"Hello from {name}")
+            scenarios.append(scenario)
+        
+        histories = asyncio.run(arun_scenarios(manager, scenarios))
+        
+        assert [h.metadata["scenario_name"] for h in histories] == ["first", "second"]
+        assert "Hello from second" in histories[1].responses[0].content
+        
+        histories = asyncio.run(manager.arun_scenarios(scenarios))
+        assert [h.metadata["scenario_name"] for h in histories] == ["first", "second"]
+    
+    def test_run_scenarios_batched(self):
+        """Test that opening turns are batched before dependent turns."""
+        llm = MockLLM(responses=["A1", "B1", "A2"])
+        manager = ConversationManager(llm)
+        
+        first = Scenario(ScenarioConfig(name="first", description="Test"))
+        first.add_user_input("Hi").add_user_input("Again")
+        second = Scenario(ScenarioConfig(name="second", description="Test"))
+        second.add_user_input("Hello")
+        
+        histories = manager.run_scenarios_batched([first, second], batch_size=2)
+        
+        assert [r.content for r in histories[0].responses] == ["A1", "A2"]
+        assert [r.content for r in histories[1].responses] == ["B1"]
+        assert [m["role"] for m in histories[0].messages] == [
+            "user", "assistant", "user", "assistant",
+        ]
+    
+    def test_run_scenarios_batched_verbose(self, capsys):
+        """Test that verbose batched runs report the opening turn like sequential runs."""
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        scenario.add_user_input("Hello").add_user_input("Again")
+        
+        ConversationManager(MockLLM(responses=["R1", "R2"])).run_scenario(scenario, verbose=True)
+        sequential = capsys.readouterr().out
+        
+        manager = ConversationManager(MockLLM(responses=["R1", "R2"]))
+        manager.run_scenarios_batched([scenario], verbose=True)
+        batched = capsys.readouterr().out
+        
+        assert batched == "Scenario 1/1: test\n" + sequential
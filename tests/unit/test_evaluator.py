@@ -1,4 +1,10 @@
 """Tests for evaluation and metrics."""
+import asyncio
+import sys
+import threading
+from dataclasses import asdict
+from datetime import datetime
+
 import pytest
 from vendingbench.core.evaluator import Evaluator, EvaluationResult, EvaluationMetric
 from vendingbench.core.conversation import ConversationHistory
@@ -48,6 +54,37 @@ class TestEvaluationResult:
         assert result.model_name == "test_model"
         assert len(result.metrics) == 0
     
+    def test_evaluated_at_iso(self):
+        """Test that the ISO evaluation time is cached and follows reassignment."""
+        result = EvaluationResult(scenario_name="test", model_name="test")
+        assert result.evaluated_at_iso == result.evaluated_at.isoformat()
+        assert result.evaluated_at_iso is result.evaluated_at_iso
+        
+        result.evaluated_at = datetime(2024, 1, 2, 3, 4, 5)
+        assert result.to_dict()["evaluated_at"] == "2024-01-02T03:04:05"
+    
+    def test_caches_are_not_fields(self):
+        """Test that private caches stay out of asdict, repr and equality."""
+        when = datetime(2024, 1, 2, 3, 4, 5)
+        result = EvaluationResult(scenario_name="test", model_name="test", evaluated_at=when)
+        other = EvaluationResult(scenario_name="test", model_name="test", evaluated_at=when)
+        result.add_metric(EvaluationMetric(name="m1", value=1.0, passed=True))
+        other.add_metric(EvaluationMetric(name="m1", value=1.0, passed=True))
+        result.get_metric("m1")
+        result.evaluated_at_iso
+        
+        assert not any(name.startswith("_") for name in asdict(result))
+        assert "_evaluated_at_iso" not in repr(result)
+        assert result == other
+    
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+    def test_result_has_no_instance_dict(self):
+        """Test that results and metrics are slotted."""
+        result = EvaluationResult(scenario_name="test", model_name="test")
+        result.add_metric(EvaluationMetric(name="m1", value=1.0, passed=True))
+        assert not hasattr(result, "__dict__")
+        assert not hasattr(result.metrics[0], "__dict__")
+    
     def test_add_metric(self):
         """Test adding a metric to result."""
         result = EvaluationResult(
@@ -76,6 +113,24 @@ class TestEvaluationResult:
         
         not_found = result.get_metric("metric3")
         assert not_found is None
+        
+        # Duplicate names resolve to the first metric, as before
+        result.add_metric(EvaluationMetric(name="metric1", value=0.0, passed=False))
+        assert result.get_metric("metric1") is metric1
+        
+        # Metrics appended directly are still found
+        metric3 = EvaluationMetric(name="metric3", value=1.0, passed=True)
+        result.metrics.append(metric3)
+        assert result.get_metric("metric3") is metric3
+        
+        # Metrics replaced or renamed in place are found under their new name
+        replacement = EvaluationMetric(name="z", value=1.0, passed=True)
+        result.metrics[0] = replacement
+        assert result.get_metric("z") is replacement
+        assert result.get_metric("metric1").value == 0.0
+        replacement.name = "renamed"
+        assert result.get_metric("z") is None
+        assert result.get_metric("renamed") is replacement
     
     def test_calculate_pass_rate(self):
         """Test calculating pass rate."""
@@ -89,6 +144,48 @@ class TestEvaluationResult:
         
         assert result.calculate_pass_rate() == pytest.approx(2/3)
     
+    def test_pass_rate_after_direct_append(self):
+        """Test that pass rate stays correct if metrics is modified directly."""
+        result = EvaluationResult(
+            scenario_name="test",
+            model_name="test",
+        )
+        result.add_metric(EvaluationMetric(name="m1", value=1.0, passed=True))
+        assert result.calculate_pass_rate() == 1.0
+        
+        result.metrics.append(EvaluationMetric(name="m2", value=0.0, passed=False))
+        assert result.num_passed == 1
+        assert result.calculate_pass_rate() == pytest.approx(0.5)
+    
+    def test_pass_rate_after_edit(self):
+        """Test that pass rate follows metrics edited in place."""
+        result = EvaluationResult(
+            scenario_name="test",
+            model_name="test",
+        )
+        result.add_metric(EvaluationMetric(name="m1", value=1.0, passed=True))
+        result.add_metric(EvaluationMetric(name="m2", value=0.0, passed=False))
+        assert result.calculate_pass_rate() == pytest.approx(0.5)
+        
+        result.metrics[1].passed = True
+        assert result.calculate_pass_rate() == 1.0
+        
+        result.metrics[0] = EvaluationMetric(name="m1", value=0.0, passed=False)
+        assert result.num_passed == 1
+    
+    def test_pass_rate_after_add(self):
+        """Test that adding a metric updates the pass rate."""
+        result = EvaluationResult(
+            scenario_name="test",
+            model_name="test",
+        )
+        result.add_metric(EvaluationMetric(name="m1", value=1.0, passed=True))
+        assert result.calculate_pass_rate() == 1.0
+        
+        result.add_metric(EvaluationMetric(name="m2", value=0.0, passed=False))
+        assert result.calculate_pass_rate() == pytest.approx(0.5)
+        assert result.to_dict()["pass_rate"] == pytest.approx(0.5)
+    
     def test_calculate_pass_rate_empty(self):
         """Test pass rate with no metrics."""
         result = EvaluationResult(
@@ -154,8 +251,17 @@ class TestEvaluator:
         assert evaluator._pattern_matches(r"\d+", "There are 5 items")
         assert evaluator._pattern_matches(r"[A-Z]+", "ABC123")
         
+        # Invalid regex falls back to substring match
+        assert evaluator._pattern_matches("(A1", "Chips (A1)")
+        
         # No match
         assert not evaluator._pattern_matches("xyz", "Hello world")
+        
+        # Lowercased text computed once by the caller
+        text = "Dispensing CHIPS from A1"
+        lowered = text.lower()
+        assert evaluator._pattern_matches("chips", text, lowered)
+        assert evaluator._pattern_matches(r"A\d", text, lowered)
     
     def test_evaluate_simple_scenario(self):
         """Test evaluating a simple scenario."""
@@ -205,6 +311,20 @@ class TestEvaluator:
         metric = result.metrics[0]
         assert metric.value > 0
     
+    def test_evaluate_response_without_content(self):
+        """Test that a response without content is evaluated like an empty reply."""
+        evaluator = Evaluator()
+        
+        history = ConversationHistory()
+        history.add_response(LLMResponse(content=None, model="test"))
+        
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        scenario.add_user_input("What's the price?", expected_patterns=["$5.00"])
+        
+        result = evaluator.evaluate(history, scenario)
+        assert result.metrics[0].value == 0.0
+        assert not result.overall_passed
+    
     def test_evaluate_pattern_match_failure(self):
         """Test failed pattern matching."""
         evaluator = Evaluator()
@@ -224,6 +344,32 @@ class TestEvaluator:
         assert not metric.passed
         assert len(metric.details.get("missing", [])) > 0
     
+    def test_evaluate_missing_responses(self):
+        """Test that turns without a response fail with their own metric."""
+        evaluator = Evaluator()
+        
+        history = ConversationHistory()
+        history.add_response(LLMResponse(content="Chips are $1.50", model="test"))
+        
+        config = ScenarioConfig(name="test", description="Test")
+        scenario = Scenario(config)
+        scenario.add_user_input("Hi")
+        scenario.add_user_input("Price of chips?", expected_patterns=["1.50"])
+        scenario.add_user_input("Buy chips", expected_patterns=["change"])
+        scenario.add_state_check("Stock", expected_patterns=["left"])
+        
+        result = evaluator.evaluate(history, scenario)
+        
+        assert [m.name for m in result.metrics] == [
+            "pattern_match_turn_0",
+            "pattern_match_turn_1",
+            "pattern_match_turn_2",
+        ]
+        assert result.metrics[0].passed
+        for metric in result.metrics[1:]:
+            assert not metric.passed
+            assert metric.details == {"error": "No response for this turn"}
+    
     def test_evaluate_with_custom_validator(self):
         """Test evaluation with custom validator."""
         evaluator = Evaluator()
@@ -271,6 +417,122 @@ class TestEvaluator:
         assert len(custom_metrics) > 0
         assert not custom_metrics[0].passed
     
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_evaluate_mixed_validators(self, parallel):
+        """Test that sync, async and failing validators keep their order."""
+        evaluator = Evaluator(parallel_validators=parallel)
+        
+        history = ConversationHistory()
+        config = ScenarioConfig(name="test", description="Test")
+        scenario = Scenario(config)
+        
+        def passes(history, scenario):
+            return True
+        
+        async def async_fails(history, scenario):
+            await asyncio.sleep(0)
+            return False
+        
+        def raises(history, scenario):
+            raise RuntimeError("boom")
+        
+        async def async_passes(history, scenario):
+            return True
+        
+        for validator in (passes, async_fails, raises, async_passes):
+            scenario.add_validator(validator)
+        
+        result = evaluator.evaluate(history, scenario)
+        
+        assert [m.name for m in result.metrics] == [f"custom_validator_{i}" for i in range(4)]
+        assert [m.passed for m in result.metrics] == [True, False, False, True]
+        assert result.metrics[1].details["validator_function"] == "async_fails"
+        assert result.metrics[2].details["error"] == "boom"
+    
+    def test_validators_run_in_order(self):
+        """Test that synchronous validators run one after another on the calling thread."""
+        evaluator = Evaluator()
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        calls = []
+        for i in range(3):
+            scenario.add_validator(
+                lambda h, s, i=i: calls.append((i, threading.get_ident())) is None
+            )
+        
+        assert evaluator.evaluate(ConversationHistory(), scenario).overall_passed
+        assert calls == [(i, threading.get_ident()) for i in range(3)]
+        assert evaluator._validator_pool is None
+    
+    def test_async_validators_in_running_loop(self):
+        """Test that coroutine validators work when evaluate is called from a coroutine."""
+        evaluator = Evaluator()
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        
+        async def passes(history, scenario):
+            return True
+        
+        scenario.add_validator(passes)
+        
+        async def main():
+            return evaluator.evaluate(ConversationHistory(), scenario)
+        
+        assert asyncio.run(main()).overall_passed
+    
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_aevaluate(self, parallel):
+        """Test that aevaluate awaits coroutine validators on the running loop."""
+        evaluator = Evaluator(parallel_validators=parallel)
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        loops = []
+        
+        def passes(history, scenario):
+            return True
+        
+        async def async_passes(history, scenario):
+            loops.append(asyncio.get_running_loop())
+            return True
+        
+        def fails(history, scenario):
+            return False
+        
+        for validator in (passes, async_passes, fails):
+            scenario.add_validator(validator)
+        
+        async def main():
+            result = await evaluator.aevaluate(ConversationHistory(), scenario)
+            return result, asyncio.get_running_loop()
+        
+        with evaluator:
+            result, loop = asyncio.run(main())
+        
+        assert [m.passed for m in result.metrics] == [True, True, False]
+        assert loops == [loop]
+        assert evaluator._validator_pool is None
+    
+    def test_cancelled_validator_fails(self):
+        """Test that a cancelled coroutine validator is reported as an error."""
+        evaluator = Evaluator()
+        scenario = Scenario(ScenarioConfig(name="test", description="Test"))
+        
+        async def cancelled(history, scenario):
+            raise asyncio.CancelledError()
+        
+        scenario.add_validator(cancelled)
+        
+        result = evaluator.evaluate(ConversationHistory(), scenario)
+        assert result.metrics[0].passed is False
+        assert "error" in result.metrics[0].details
+    
+    def test_close_shuts_down_pool(self):
+        """Test that close shuts down the validator pool and can be repeated."""
+        evaluator = Evaluator(parallel_validators=True)
+        pool = evaluator._get_validator_pool()
+        evaluator.close()
+        assert evaluator._validator_pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(print)
+        evaluator.close()
+    
     def test_overall_passed(self):
         """Test that overall_passed is calculated correctly."""
         evaluator = Evaluator()
@@ -288,3 +550,24 @@ class TestEvaluator:
         
         # All patterns match, should pass
         assert result.overall_passed
+    
+    def test_specialize(self):
+        """Test evaluating through a scenario-specialized function."""
+        evaluator = Evaluator()
+        
+        config = ScenarioConfig(name="test", description="Test")
+        scenario = Scenario(config)
+        scenario.add_user_input("Buy chips", expected_patterns=["Chips", r"\$\d+\.\d{2}"])
+        scenario.add_user_input("No check")
+        scenario.add_state_check("Stock", expected_patterns=["only 2"])
+        
+        history = ConversationHistory()
+        history.add_response(LLMResponse(content="CHIPS for $1.50", model="test"))
+        history.add_response(LLMResponse(content="Sold out", model="test"))
+        
+        evaluate = evaluator.specialize(scenario)
+        result = evaluate(history)
+        assert result.get_metric("pattern_match_turn_0").passed
+        assert result.get_metric("pattern_match_turn_1").details["missing"] == ["only 2"]
+        expected = evaluator.evaluate(history, scenario).to_dict()["metrics"]
+        assert result.to_dict()["metrics"] == expected
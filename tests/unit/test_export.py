@@ -0,0 +1,205 @@
+"""Tests for export utilities."""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum, IntEnum
+from uuid import UUID
+
+import pytest
+from vendingbench.core import _json
+from vendingbench.core.conversation import ConversationHistory
+from vendingbench.core.evaluator import EvaluationResult, EvaluationMetric
+from vendingbench.core.llm_interface import LLMResponse
+from vendingbench.utils import export
+from vendingbench.utils.export import (
+    save_evaluation_result,
+    save_conversation_history,
+    save_batch_results,
+    load_evaluation_result,
+)
+
+
+class Color(Enum):
+    """Plain enum, which json.dumps rejects."""
+    
+    RED = "red"
+
+
+class Level(IntEnum):
+    """Int enum, which json.dumps writes as its value."""
+    
+    HIGH = 2
+
+
+class Mode(str, Enum):
+    """Str enum, which json.dumps writes as its value."""
+    
+    FAST = "fast"
+
+
+def make_result(name="test", passed=True):
+    """Build a small evaluation result."""
+    result = EvaluationResult(scenario_name=name, model_name="test-model")
+    result.add_metric(EvaluationMetric(name="m1", value=1.0 if passed else 0.0, passed=passed))
+    result.overall_passed = passed
+    return result
+
+
+@pytest.fixture(params=[False, True], ids=["buffered", "fast-io"])
+def fast_io(request, monkeypatch):
+    """Run a test with and without the O_DIRECT write path enabled."""
+    if request.param:
+        monkeypatch.setenv("VENDINGBENCH_FAST_IO", "1")
+    else:
+        monkeypatch.delenv("VENDINGBENCH_FAST_IO", raising=False)
+    return request.param
+
+
+class TestJSONEncoding:
+    """Test the JSON encoding backends."""
+    
+    @pytest.fixture(params=["orjson", "msgspec", "json"])
+    def backend(self, request, monkeypatch):
+        """Make _json.dumps use one encoder (msgspec is only imported without orjson)."""
+        for name in ("orjson", "msgspec"):
+            module = pytest.importorskip(name) if name == request.param else None
+            monkeypatch.setattr(_json, name, module)
+        return request.param
+    
+    @pytest.mark.parametrize("indent", [True, False])
+    def test_dumps_layout(self, backend, indent):
+        """Test that every backend emits the same layout."""
+        obj = {"metrics": [{"name": "m1", "passed": True}], "metadata": {}}
+        if indent:
+            expected = json.dumps(obj, indent=2)
+        else:
+            expected = json.dumps(obj, separators=(",", ":"))
+        assert _json.dumps(obj, indent=indent) == expected.encode("utf-8")
+    
+    @pytest.mark.parametrize("indent", [True, False])
+    @pytest.mark.parametrize("obj", [
+        {"metadata": {1: "one", 2.5: "half", None: "none"}},
+        {"metadata": {"seed": 2 ** 70, "ids": [-(2 ** 64)]}},
+        {"value": float("nan"), "bounds": [float("-inf"), float("inf")], "max_tokens": None},
+    ], ids=["non-str-keys", "big-ints", "non-finite"])
+    def test_dumps_matches_stdlib(self, backend, indent, obj):
+        """Test that data the fast encoders would reject or alter is encoded by json."""
+        if indent:
+            expected = json.dumps(obj, indent=2)
+        else:
+            expected = json.dumps(obj, separators=(",", ":"))
+        assert _json.dumps(obj, indent=indent) == expected.encode("utf-8")
+    
+    def test_dumps_equivalent(self, backend):
+        """Test that output decodes like json's where the bytes may differ."""
+        obj = {
+            "floats": [1e16, 1e-07, 0.1, -2.5e300],
+            "text": "caf\u00e9 \u2028 \x7f \U0001f36b",
+            "nested": {"turns": [{"content": "\"quoted\"\n"}]},
+        }
+        encoded = _json.dumps(obj)
+        assert json.loads(encoded) == json.loads(json.dumps(obj)) == obj
+    
+    @pytest.mark.parametrize("value", [
+        datetime(2024, 1, 2, 3, 4, 5),
+        date(2024, 1, 2),
+        EvaluationMetric(name="m1", value=1.0, passed=True),
+        UUID("12345678-1234-5678-1234-567812345678"),
+        Color.RED,
+        Decimal("1.5"),
+        b"bytes",
+        {1, 2},
+    ], ids=["datetime", "date", "dataclass", "uuid", "enum", "decimal", "bytes", "set"])
+    def test_dumps_rejects_like_stdlib(self, backend, value):
+        """Test that every backend rejects the values json.dumps rejects."""
+        with pytest.raises(TypeError):
+            json.dumps({"metadata": {"value": value}})
+        with pytest.raises(TypeError):
+            _json.dumps({"metadata": {"value": value}})
+    
+    @pytest.mark.parametrize("key", [
+        datetime(2024, 1, 2, 3, 4, 5),
+        UUID("12345678-1234-5678-1234-567812345678"),
+        Color.RED,
+    ], ids=["datetime", "uuid", "enum"])
+    def test_dumps_rejects_keys_like_stdlib(self, backend, key):
+        """Test that every backend rejects the keys json.dumps rejects."""
+        with pytest.raises(TypeError):
+            json.dumps({"metadata": {key: 1}})
+        with pytest.raises(TypeError):
+            _json.dumps({"metadata": {key: 1}})
+    
+    def test_dumps_int_and_str_enums(self, backend):
+        """Test that int and str enums are written like json.dumps writes them."""
+        obj = {"level": Level.HIGH, "mode": Mode.FAST, Level.HIGH: "key"}
+        assert json.loads(_json.dumps(obj)) == json.loads(json.dumps(obj))
+
+
+class TestExport:
+    """Test saving and loading results."""
+    
+    def test_save_and_load_result(self, tmp_path, fast_io):
+        """Test round-tripping an evaluation result."""
+        path = tmp_path / "nested" / "result.json"
+        save_evaluation_result(make_result(), path)
+        
+        loaded = load_evaluation_result(path)
+        assert loaded["scenario_name"] == "test"
+        assert loaded["pass_rate"] == 1.0
+        assert loaded["metrics"][0]["name"] == "m1"
+    
+    def test_save_conversation_history(self, tmp_path, fast_io):
+        """Test saving a conversation history."""
+        history = ConversationHistory()
+        history.add_message("user", "Hello")
+        history.add_response(LLMResponse(content="Hi there", model="test-model"))
+        
+        path = tmp_path / "history.json"
+        save_conversation_history(history, path)
+        
+        data = json.loads(path.read_text(encoding="utf-8"))
+        assert data["num_turns"] == 1
+        assert data["messages"][1]["content"] == "Hi there"
+    
+    def test_write_bytes_large(self, tmp_path, fast_io):
+        """Test that writes larger than one block keep their exact length."""
+        data = b"x" * (export._DIRECT_IO_ALIGNMENT * 2 + 17)
+        path = tmp_path / "large.bin"
+        export._write_bytes(path, data)
+        assert path.read_bytes() == data
+    
+    def test_save_batch_results(self, tmp_path):
+        """Test saving a batch of results with a summary."""
+        save_batch_results([make_result("a"), make_result("b", passed=False)], tmp_path)
+        
+        summaries = list(tmp_path.glob("batch_results_summary_*.json"))
+        assert len(summaries) == 1
+        summary = json.loads(summaries[0].read_text(encoding="utf-8"))
+        assert summary["num_results"] == 2
+        assert summary["aggregate_pass_rate"] == pytest.approx(0.5)
+        assert len(list(tmp_path.glob("batch_results_[0-9]_*.json"))) == 2
+    
+    def test_save_batch_results_many(self, tmp_path, fast_io):
+        """Test that concurrent writes produce every result file intact."""
+        count = export.MAX_WRITE_WORKERS + 8
+        save_batch_results([make_result(f"s{i}") for i in range(count)], tmp_path / "out")
+        
+        for i in range(count):
+            path = next((tmp_path / "out").glob(f"batch_results_{i}_*.json"))
+            assert json.loads(path.read_text(encoding="utf-8"))["scenario_name"] == f"s{i}"
+    
+    def test_save_batch_results_converts_once(self, tmp_path, monkeypatch):
+        """Test that each result is converted to a dict only once."""
+        calls = []
+        to_dict = EvaluationResult.to_dict
+        monkeypatch.setattr(
+            EvaluationResult, "to_dict", lambda self: calls.append(self) or to_dict(self)
+        )
+        
+        results = [make_result("a"), make_result("b")]
+        save_batch_results(results, tmp_path)
+        assert len(calls) == len(results)
+        
+        first_path = next(tmp_path.glob("batch_results_0_*.json"))
+        first = json.loads(first_path.read_text(encoding="utf-8"))
+        assert first["scenario_name"] == "a"
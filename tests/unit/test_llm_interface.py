@@ -1,6 +1,10 @@
 """Tests for LLM interface and adapters."""
+import asyncio
+from dataclasses import fields
+from types import SimpleNamespace
+
 import pytest
-from vendingbench.core.llm_interface import LLMInterface, LLMResponse
+from vendingbench.core.llm_interface import LLMResponse
 from vendingbench.adapters.mock_llm import MockLLM
 
 
@@ -29,6 +33,12 @@ class TestLLMResponse:
         assert result["model"] == "test-model"
         assert result["metadata"]["key"] == "value"
         assert "timestamp" in result
+    
+    def test_response_to_dict_covers_fields(self):
+        """Test that the hand-written to_dict keeps up with the dataclass fields."""
+        response = LLMResponse(content="Test", model="test-model")
+        expected = {f.name for f in fields(LLMResponse)} - {"raw_response"}
+        assert set(response.to_dict()) == expected
 
 
 class TestLLMInterface:
@@ -60,11 +70,184 @@ class TestLLMInterface:
         ]
         assert llm.validate_messages(messages) is False
     
+    def test_validate_messages_non_string(self):
+        """Test message validation with non-string content or unhashable role."""
+        llm = MockLLM()
+        assert llm.validate_messages([{"role": "user", "content": 42}]) is False
+        assert llm.validate_messages([{"role": ["user"], "content": "Hi"}]) is False
+    
+    def test_validate_messages_view(self):
+        """Test that a read-only messages view is accepted like a list."""
+        from vendingbench.core.conversation import ConversationHistory
+        
+        history = ConversationHistory()
+        history.add_message("user", "Hello")
+        llm = MockLLM()
+        assert llm.validate_messages(history.messages_view()) is True
+        assert llm.generate(history.messages_view()).content == "Mock response to: Hello"
+    
+    def test_validate_messages_mapping(self):
+        """Test that non-dict mappings are accepted and non-mappings rejected."""
+        from types import MappingProxyType
+        
+        llm = MockLLM()
+        message = MappingProxyType({"role": "user", "content": "Hi"})
+        assert llm.validate_messages([message]) is True
+        assert llm.validate_messages([("user", "Hi")]) is False
+    
     def test_validate_messages_empty(self):
         """Test message validation with empty list."""
         llm = MockLLM()
         assert llm.validate_messages([]) is False
     
+    def test_batch_generate_default(self):
+        """Test that the default batch implementation answers each prompt."""
+        llm = MockLLM(responses=["Response 1", "Response 2"])
+        prompts = [
+            [{"role": "user", "content": "First"}],
+            [{"role": "user", "content": "Second"}],
+        ]
+        
+        responses = llm.batch_generate(prompts)
+        assert [r.content for r in responses] == ["Response 1", "Response 2"]
+    
+    def test_split_batch_reply(self):
+        """Test splitting a batched reply on answer marker lines."""
+        from vendingbench.adapters.openai_adapter import OpenAIAdapter
+        
+        reply = "<<<ANSWER 1>>>\nChips are $1.50\n[2] is sold out\n<<<ANSWER 2>>>\nTwo left"
+        assert OpenAIAdapter._split_batch(reply, 2) == [
+            "Chips are $1.50\n[2] is sold out",
+            "Two left",
+        ]
+        assert OpenAIAdapter._split_batch("<<<ANSWER 1>>>\nOnly one", 2) is None
+        swapped = "<<<ANSWER 2>>>\nTwo left\n<<<ANSWER 1>>>\nChips"
+        assert OpenAIAdapter._split_batch(swapped, 2) is None
+    
+    def test_openai_batch_generate(self):
+        """Test that packing is opt-in and scales max_tokens and splits usage."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters.openai_adapter import OpenAIAdapter
+        
+        calls = []
+        
+        def create(**params):
+            calls.append(params)
+            completion = make_completion(1)
+            completion.usage = SimpleNamespace(
+                prompt_tokens=9, completion_tokens=5, total_tokens=14
+            )
+            if len(calls) == 1 and params["messages"][0]["role"] == "system":
+                content = "<<<ANSWER 1>>>\nChips\n<<<ANSWER 2>>>\nSoda"
+                completion.choices[0].message.content = content
+            return completion
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        prompts = [
+            [{"role": "user", "content": "Snack?"}],
+            [{"role": "user", "content": "Drink?"}],
+        ]
+        
+        adapter = OpenAIAdapter(model_name="gpt-4", api_key="test-key")
+        adapter.client = client
+        adapter.batch_generate(prompts, max_tokens=100)
+        assert [call["max_tokens"] for call in calls] == [100, 100]
+        
+        calls.clear()
+        adapter = OpenAIAdapter(model_name="gpt-4", api_key="test-key", pack_batches=True)
+        adapter.client = client
+        responses = adapter.batch_generate(prompts, max_tokens=100)
+        assert len(calls) == 1 and calls[0]["max_tokens"] == 200
+        assert [r.content for r in responses] == ["Chips", "Soda"]
+        assert [r.metadata["usage"]["completion_tokens"] for r in responses] == [3, 2]
+        assert sum(r.metadata["usage"]["total_tokens"] for r in responses) == 14
+    
+    def test_openai_build_params(self):
+        """Test that extra parameters cannot replace the adapter's model."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters.openai_adapter import OpenAIAdapter
+        
+        adapter = OpenAIAdapter(model_name="gpt-4", api_key="test-key")
+        messages = [{"role": "user", "content": "Test"}]
+        params = adapter._build_params(messages, 0.5, None, model="other", top_p=0.9)
+        assert params == {"model": "gpt-4", "messages": messages, "temperature": 0.5, "top_p": 0.9}
+        assert params["messages"] is messages
+        
+        from vendingbench.core.conversation import ConversationHistory
+        
+        history = ConversationHistory()
+        history.add_message("user", "Test")
+        params = adapter._build_params(history.messages_view(), 0.5, None)
+        assert type(params["messages"]) is list and params["messages"] == messages
+    
+    def test_openai_tool_call_content(self):
+        """Test that a completion without text content converts to empty content."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters.openai_adapter import OpenAIAdapter
+        
+        completion = make_completion(1)
+        completion.choices[0].message.content = None
+        completion.choices[0].finish_reason = "tool_calls"
+        
+        adapter = OpenAIAdapter(model_name="gpt-4", api_key="test-key")
+        response = adapter._to_llm_response(completion)
+        assert response.content == ""
+        assert response.metadata["finish_reason"] == "tool_calls"
+    
+    def test_openai_response_without_usage(self):
+        """Test that a completion without usage converts without usage metadata."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters.openai_adapter import OpenAIAdapter
+        
+        adapter = OpenAIAdapter(model_name="gpt-4", api_key="test-key")
+        response = adapter._to_llm_response(make_completion(1, usage=False))
+        assert response.content == "Answer 0"
+        assert "usage" not in response.metadata
+    
+    def test_openai_generate_full_streamed(self):
+        """Test collecting a streamed completion into one response."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters.openai_adapter import OpenAIAdapter
+        
+        def chunk(content, finish_reason=None):
+            delta = SimpleNamespace(content=content)
+            choice = SimpleNamespace(delta=delta, finish_reason=finish_reason)
+            return SimpleNamespace(choices=[choice], model="gpt-4-0613")
+        
+        calls = []
+        
+        def create(**params):
+            calls.append(params)
+            return iter([chunk("Chips "), chunk(None), chunk("are $1.50"), chunk(None, "stop")])
+        
+        adapter = OpenAIAdapter(model_name="gpt-4", api_key="test-key")
+        completions = SimpleNamespace(create=create)
+        adapter.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        
+        response = adapter.generate_full_streamed([{"role": "user", "content": "Price?"}])
+        assert response.content == "Chips are $1.50"
+        assert response.model == "gpt-4"
+        assert response.metadata["finish_reason"] == "stop"
+        assert calls[0]["stream"] is True
+    
+    def test_openai_aclose_closes_http_client(self):
+        """Test that aclose closes the loop's shared HTTP client."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters._http import get_async_client
+        from vendingbench.adapters.openai_adapter import OpenAIAdapter
+        
+        adapter = OpenAIAdapter(model_name="gpt-4", api_key="test-key")
+        
+        async def run():
+            client = get_async_client()
+            adapter.async_client
+            await adapter.aclose()
+            assert client.is_closed
+            assert get_async_client() is not client
+            await adapter.aclose()
+        
+        asyncio.run(run())
+    
     def test_get_model_info(self):
         """Test getting model information."""
         llm = MockLLM(model_name="test-model", extra_param="value")
@@ -97,6 +280,20 @@ class TestMockLLM:
         response = llm.generate(messages)
         assert "Hello world" in response.content
     
+    def test_mock_echo_last_user_message(self):
+        """Test that the mock echoes the most recent user message."""
+        llm = MockLLM()
+        messages = [
+            {"role": "user", "content": "First"},
+            {"role": "assistant", "content": "Reply"},
+            {"role": "user", "content": "Second"},
+            {"role": "assistant", "content": "Reply"},
+        ]
+        
+        assert llm.generate(messages).content == "Mock response to: Second"
+        response = llm.generate([{"role": "system", "content": "Setup"}])
+        assert response.content == "Mock response with no user input"
+    
     def test_mock_call_count(self):
         """Test that mock LLM tracks call count."""
         llm = MockLLM()
@@ -122,6 +319,20 @@ class TestMockLLM:
         assert llm.call_count == 0
         assert llm.response_index == 0
     
+    def test_mock_responses_mutable(self):
+        """Test that changes to responses and response_index take effect."""
+        llm = MockLLM(responses=["Response 1"])
+        messages = [{"role": "user", "content": "Test"}]
+        
+        assert llm.generate(messages).content == "Response 1"
+        llm.responses.append("Response 2")
+        assert llm.generate(messages).content == "Response 2"
+        
+        llm.responses = ["A", "B", "C"]
+        llm.response_index = 2
+        assert llm.generate(messages).content == "C"
+        assert llm.generate(messages).content == "Mock response to: Test"
+    
     def test_mock_stream(self):
         """Test mock LLM streaming."""
         llm = MockLLM(responses=["Hello world test"])
@@ -131,6 +342,19 @@ class TestMockLLM:
         assert len(chunks) > 0
         full_response = "".join(chunks).strip()
         assert "Hello world test" in full_response
+        assert llm.call_count == 1
+        
+        with pytest.raises(ValueError):
+            list(llm.generate_stream([{"role": "invalid"}]))
+    
+    def test_mock_agenerate(self):
+        """Test async generation with the mock LLM."""
+        llm = MockLLM(responses=["Async response"])
+        messages = [{"role": "user", "content": "Test"}]
+        
+        response = asyncio.run(llm.agenerate(messages))
+        assert response.content == "Async response"
+        assert llm.call_count == 1
     
     def test_mock_invalid_messages(self):
         """Test that mock LLM validates messages."""
@@ -139,3 +363,158 @@ class TestMockLLM:
         
         with pytest.raises(ValueError):
             llm.generate(invalid_messages)
+    
+    def test_mock_generate_trusted(self, monkeypatch):
+        """Test that the trusted path skips message validation."""
+        llm = MockLLM(responses=["Trusted"])
+        monkeypatch.setattr(llm, "validate_messages", lambda messages: False)
+        
+        response = llm.generate_trusted([{"role": "user", "content": "Test"}])
+        assert response.content == "Trusted"
+        assert llm.call_count == 1
+
+
+def make_completion(n, usage=True):
+    """Build a chat completion with ``n`` choices."""
+    choices = [
+        SimpleNamespace(message=SimpleNamespace(content=f"Answer {i}"), finish_reason="stop")
+        for i in range(n)
+    ]
+    return SimpleNamespace(
+        choices=choices,
+        usage=(
+            SimpleNamespace(prompt_tokens=3, completion_tokens=n, total_tokens=3 + n)
+            if usage
+            else None
+        ),
+    )
+
+
+class TestBatchingOpenAIAdapter:
+    """Test request coalescing in BatchingOpenAIAdapter."""
+    
+    @pytest.fixture
+    def make_adapter(self, monkeypatch):
+        """Build a batching adapter whose async API calls go to ``create``."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters.openai_adapter import BatchingOpenAIAdapter
+        
+        def make(create, **kwargs):
+            completions = SimpleNamespace(create=create)
+            client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+            monkeypatch.setattr(
+                BatchingOpenAIAdapter, "async_client", property(lambda self: client)
+            )
+            return BatchingOpenAIAdapter(
+                model_name="gpt-4", api_key="test-key", batch_window_ms=5, **kwargs
+            )
+        
+        return make
+    
+    def test_groups_identical_requests(self, make_adapter):
+        """Test that identical requests share one call and fan out its choices."""
+        calls = []
+        
+        async def create(**params):
+            calls.append(params)
+            return make_completion(params.get("n", 1))
+        
+        adapter = make_adapter(create)
+        same = [{"role": "user", "content": "Price?"}]
+        other = [{"role": "user", "content": "Stock?"}]
+        
+        async def run():
+            try:
+                return await asyncio.gather(
+                    adapter.agenerate(same),
+                    adapter.agenerate(same),
+                    adapter.agenerate(other),
+                    adapter.agenerate(same),
+                )
+            finally:
+                await adapter.aclose()
+        
+        responses = asyncio.run(run())
+        
+        assert sorted(call.get("n", 1) for call in calls) == [1, 3]
+        contents = [r.content for i, r in enumerate(responses) if i != 2]
+        assert contents == ["Answer 0", "Answer 1", "Answer 2"]
+        assert responses[2].content == "Answer 0"
+        assert [r.metadata["batch_size"] for r in responses] == [3, 3, 1, 3]
+        merged = [r.metadata["usage"] for i, r in enumerate(responses) if i != 2]
+        assert sum(usage["total_tokens"] for usage in merged) == 6
+        assert responses[2].metadata["usage"]["total_tokens"] == 4
+    
+    @pytest.mark.parametrize("completion, error", [
+        (RuntimeError("rate limited"), RuntimeError),
+        (make_completion(1), IndexError),
+    ], ids=["api-error", "too-few-choices"])
+    def test_errors_reach_every_caller(self, make_adapter, completion, error):
+        """Test that a failed call or conversion fails every waiting request."""
+        async def create(**params):
+            if isinstance(completion, Exception):
+                raise completion
+            return completion
+        
+        adapter = make_adapter(create)
+        messages = [{"role": "user", "content": "Price?"}]
+        
+        async def run():
+            try:
+                return await asyncio.wait_for(
+                    asyncio.gather(
+                        adapter.agenerate(messages),
+                        adapter.agenerate(messages),
+                        return_exceptions=True,
+                    ),
+                    timeout=5,
+                )
+            finally:
+                await adapter.aclose()
+        
+        outcomes = asyncio.run(run())
+        assert [type(o) for o in outcomes] == [error, error]
+    
+    def test_aclose_cancels_pending(self, make_adapter):
+        """Test that aclose cancels in-flight requests and the batcher."""
+        async def create(**params):
+            await asyncio.Event().wait()
+        
+        adapter = make_adapter(create)
+        
+        async def run():
+            pending = asyncio.ensure_future(adapter.agenerate([{"role": "user", "content": "Hi"}]))
+            await asyncio.sleep(0.05)
+            assert adapter._dispatches
+            await adapter.aclose()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+            assert adapter._batcher is None
+            assert not adapter._dispatches
+        
+        asyncio.run(run())
+    
+    def test_token_bucket(self):
+        """Test that the token bucket allows a burst, then paces requests."""
+        pytest.importorskip("openai")
+        from vendingbench.adapters.openai_adapter import _TokenBucket
+        
+        now = [0.0]
+        sleeps = []
+        
+        async def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+        
+        async def run():
+            bucket = _TokenBucket(4, clock=lambda: now[0], sleep=sleep)
+            for _ in range(4):
+                await bucket.acquire()
+            burst_sleeps = len(sleeps)
+            for _ in range(3):
+                await bucket.acquire()
+            return burst_sleeps
+        
+        assert asyncio.run(run()) == 0
+        assert sleeps == [0.25, 0.25, 0.25]
+        assert now[0] == 0.75
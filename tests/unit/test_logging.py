@@ -0,0 +1,28 @@
+"""Tests for logging utilities."""
+import logging
+
+from vendingbench.utils.logging import setup_logger
+
+
+def test_setup_logger_lazy_formatting(tmp_path, capsys):
+    """Test that records are written synchronously and filtered by level."""
+    log_file = tmp_path / "run.log"
+    logger = setup_logger("vendingbench.test_lazy", level=logging.INFO, log_file=str(log_file))
+    try:
+        assert setup_logger("vendingbench.test_lazy") is logger
+        assert len(logger.handlers) == 2
+        
+        print("before")
+        logger.info("evaluated %s", "scenario-a")
+        print("after")
+        logger.debug("filtered out %s", "scenario-b")
+    finally:
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+    
+    out = capsys.readouterr().out
+    assert out.index("before") < out.index("evaluated scenario-a") < out.index("after")
+    text = log_file.read_text(encoding="utf-8")
+    assert "INFO - evaluated scenario-a" in text
+    assert "scenario-b" not in text
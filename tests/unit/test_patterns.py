@@ -0,0 +1,206 @@
+"""Tests for pattern compilation and matching."""
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from vendingbench.core import _regex
+from vendingbench.core.patterns import (
+    build_matcher,
+    compile_pattern,
+    is_literal,
+    pattern_matches,
+    prepare_matcher,
+    prepare_pattern,
+)
+
+
+class TestPatternHelpers:
+    """Test module-level pattern helpers."""
+    
+    def test_compile_pattern_cached(self):
+        """Test that compiled patterns are reused."""
+        assert compile_pattern(r"\d+") is compile_pattern(r"\d+")
+    
+    def test_compile_pattern_invalid(self):
+        """Test that invalid regexes compile to None."""
+        assert compile_pattern("unbalanced (") is None
+    
+    def test_is_literal(self):
+        """Test literal vs regex classification."""
+        assert is_literal("only 2")
+        assert is_literal("doesn't exist")
+        assert not is_literal("$3.50")
+        assert not is_literal(r"\d+")
+    
+    def test_pattern_matches(self):
+        """Test regex and substring matching."""
+        assert pattern_matches(r"\$3\.50", "Your change is $3.50")
+        assert pattern_matches("$3.50", "Your change is $3.50")
+        assert not pattern_matches("$3.00", "Your change is $3.50")
+    
+    def test_prepare_pattern(self):
+        """Test that literals skip the regex and patterns are cached."""
+        literal = prepare_pattern("Only 2")
+        assert literal.regex is None
+        assert literal.matches("ONLY 2 LEFT")
+        assert prepare_pattern("Only 2") is literal
+        
+        price = prepare_pattern("$3.50")
+        assert price.regex is not None
+        assert price.matches("Your change is $3.50", "your change is $3.50")
+        assert not prepare_pattern(r"\d+ left").matches("none left")
+
+
+@pytest.mark.filterwarnings("ignore:Possible nested set:FutureWarning")
+@pytest.mark.parametrize("backend", ["pcre2", "regex", "re"])
+def test_compile_caseless_backends(monkeypatch, backend):
+    """Test that every regex backend agrees with re."""
+    for name in ("pcre2", "regex"):
+        if name == backend and getattr(_regex, name) is None:
+            pytest.skip(f"{name} not installed")
+        if name != backend:
+            monkeypatch.setattr(_regex, name, None)
+    
+    texts = [
+        "CHIPS sold, your change is $3.50. 2 left",
+        "CAFÉ: 3 left\n",
+        "Çips ٣ left",
+        "İ1 and ı2",
+        "STRAẞE \u212a1 \u017f2",
+        "zx ac abbc",
+    ]
+    patterns = [
+        r"\$3\.50", r"\d+ LEFT", "chips", r"sold out|unavailable", r"\u0032 left",
+        r"left\Z", r"left$", r"\w+ left", r"caf\w", r"i\d", r"[^a-z]\d", r"k\d", r"s\d",
+        r"ab{,2}c", r"[[:alpha:]]x", r"é", r"stra\w+e",
+    ]
+    for pattern in patterns:
+        compiled = _regex.compile_caseless(pattern)
+        for text in texts:
+            expected = re.search(pattern, text, re.IGNORECASE)
+            assert (compiled.search(text) is not None) == (expected is not None), (pattern, text)
+    
+    with pytest.raises(re.error):
+        _regex.compile_caseless("unbalanced (")
+
+
+def test_lower_unlike_re_complete():
+    """Test that every character re folds unlike str.lower() is listed."""
+    if _regex._LOWER_UNLIKE_RE is None:
+        pytest.skip("table not used on this Python version")
+    casefix = pytest.importorskip("re._casefix")
+    import _sre
+    
+    extra = {c for key, values in casefix._EXTRA_CASES.items() for c in (key, *values)}
+    unlike = set()
+    for code in range(sys.maxunicode + 1):
+        lowered = _sre.unicode_tolower(code)
+        if lowered in extra or chr(code).lower() != chr(lowered):
+            unlike.add(chr(code))
+    assert {c for c in unlike if not c.isascii()} <= _regex._LOWER_UNLIKE_RE
+
+
+def test_lowers_like_re_unchecked_version(monkeypatch):
+    """Test that non-ASCII texts take the regex path when the table is unused."""
+    monkeypatch.setattr(_regex, "_LOWER_UNLIKE_RE", None)
+    assert _regex.lowers_like_re("chips")
+    assert not _regex.lowers_like_re("café")
+
+
+class TestMatcher:
+    """Test compiled patterns and per-turn matchers."""
+    
+    def test_match_turn(self):
+        """Test matching one text against a turn's patterns at once."""
+        match = build_matcher(
+            [["Chips", r"\$3\.50", "$3.50", "only 2", "unbalanced (", r"\d+ left"]]
+        )
+        responses = [SimpleNamespace(content="CHIPS sold, your change is $3.50. 2 left")]
+        assert match(responses) == [(True, True, True, False, False, True)]
+    
+    @pytest.mark.parametrize("pattern", [
+        r"\w+ left", r"\d+ left$", r"left\Z", r"ab{,2}c", r"[[:alpha:]]+x",
+        r"\bcaf\w\b", r"^line2", r"line1$", r"k\d", r"i\d", r"\s+end", r"stra\w+e", r"é\d",
+    ])
+    @pytest.mark.filterwarnings("ignore:Possible nested set:FutureWarning")
+    def test_matches_agrees_with_re(self, pattern):
+        """Test that matching gives re's verdict on non-ASCII text and anchors."""
+        texts = [
+            "café 3 left", "CAFÉ 3 left\n", "٣ left", "3 left\n", "ac", "abbc", "ab{,2}c",
+            "zx", "line1\nline2", "\u212a1", "a\xa0end", "STRASSE", "straße", "É1", "İ1 ı2",
+        ]
+        compiled = prepare_pattern(pattern)
+        for text in texts:
+            expected = (
+                re.search(pattern, text, re.IGNORECASE) is not None
+                or pattern.lower() in text.lower()
+            )
+            assert compiled.matches(text) == expected, text
+    
+    def test_match_concurrent(self):
+        """Test that one matcher can be called from several threads."""
+        match = prepare_matcher(((r"A\d+", r"chips?"),))
+        responses = [SimpleNamespace(content="x" * 200000 + " a12 chips")]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: match(responses), range(200)))
+        assert results == [[(True, True)]] * 200
+    
+    def test_build_matcher(self):
+        """Test the per-turn matcher."""
+        turn_patterns = [["Chips", r"\$3\.50"], ["$3.50", "unbalanced ("], [r"\d+ left"]]
+        match = build_matcher(turn_patterns)
+        
+        responses = [SimpleNamespace(content=c) for c in ("CHIPS: $3.50", "$3.50 back")]
+        assert match(responses) == [(True, True), (True, False)]
+        assert match([]) == []
+    
+    def test_match_literal_and_regex(self):
+        """Test a turn mixing a literal with a regex, including re-only case folding."""
+        assert prepare_pattern("insufficient").regex is None
+        assert prepare_pattern(r"\d+ left").regex is not None
+        
+        match = build_matcher([["insufficient", r"\d+ left"]])
+        assert match([SimpleNamespace(content="INSUFFICIENT funds, 2 left")]) == [(True, True)]
+        assert match([SimpleNamespace(content="İNSUFFICIENT FUNDS")]) == [(True, False)]
+    
+    def test_prepare_matcher_shared(self):
+        """Test that matchers are shared by turn patterns."""
+        turn_patterns = (("Chips", r"\$3\.50"), (r"\d+ left",))
+        match = prepare_matcher(turn_patterns)
+        assert prepare_matcher(turn_patterns) is match
+        
+        responses = [SimpleNamespace(content=c) for c in ("CHIPS: $3.50", "2 left")]
+        assert match(responses) == [(True, True), (True,)]
+    
+    def test_literals_fold_like_re(self):
+        """Test that literals give re's verdict where str.lower() folds case differently."""
+        chars = sorted(_regex._LOWER_UNLIKE_RE or ()) + list("iIsSkKxX")
+        literals = chars + ["insufficient", "straße", "Σοφία"]
+        texts = chars + ["İNSUFFICIENT FUNDS", "strasse", "STRAẞE", "ΣΟΦΙΑ", "σοφίας"]
+        match = build_matcher([[p] for p in literals])
+        
+        for text in texts:
+            expected = [
+                re.search(re.escape(p), text, re.IGNORECASE) is not None
+                or p.lower() in text.lower()
+                for p in literals
+            ]
+            assert [prepare_pattern(p).matches(text) for p in literals] == expected, text
+            flags = match([SimpleNamespace(content=text)] * len(literals))
+            assert [f[0] for f in flags] == expected, text
+    
+    def test_build_matcher_many_patterns(self):
+        """Test that large turns give the same flags as pattern_matches."""
+        words = [
+            "chips", "cookies", "candy", "water", "soda",
+            "change", "eight", "he", "she", "hers",
+        ]
+        turn_patterns = [words + ["", "out of stock", r"\$\d+\.00", "sold (out", r"\d+ left"]]
+        match = build_matcher(turn_patterns)
+        
+        text = "Ushers sold CHIPS and Soda for $8.00; SOLD (OUT of water, 3 left"
+        expected = tuple(pattern_matches(p, text) for p in turn_patterns[0])
+        assert match([SimpleNamespace(content=text)]) == [expected]
+        assert expected.count(True) == 10
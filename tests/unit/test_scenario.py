@@ -1,4 +1,6 @@
 """Tests for scenario management."""
+from dataclasses import fields
+
 import pytest
 from vendingbench.core.scenario import (
     Scenario,
@@ -49,6 +51,16 @@ class TestConversationTurn:
         assert turn.content == "Test input"
         assert len(turn.expected_patterns) == 2
     
+    def test_user_message(self):
+        """Test that every call builds a new user message."""
+        turn = ConversationTurn(turn_type=TurnType.USER_INPUT, content="Test")
+        message = turn.user_message()
+        assert message == {"role": "user", "content": "Test"}
+        assert turn.user_message() is not message
+        
+        turn.content = "Changed"
+        assert turn.user_message()["content"] == "Changed"
+    
     def test_turn_to_dict(self):
         """Test converting turn to dictionary."""
         turn = ConversationTurn(
@@ -58,6 +70,26 @@ class TestConversationTurn:
         result = turn.to_dict()
         assert result["turn_type"] == "user_input"
         assert result["content"] == "Test"
+    
+    def test_patterns_interned(self):
+        """Test that equal patterns of different turns share one string."""
+        pattern = "".join(["cha", "nge"])
+        patterns = [pattern]
+        first = ConversationTurn(TurnType.USER_INPUT, "Buy", expected_patterns=patterns)
+        second = ConversationTurn(
+            TurnType.USER_INPUT, "Buy", expected_patterns=["".join(["chan", "ge"])]
+        )
+        assert first.expected_patterns[0] is second.expected_patterns[0]
+        assert patterns == ["change"] and patterns[0] is pattern
+    
+    @pytest.mark.parametrize("obj", [
+        ConversationTurn(turn_type=TurnType.USER_INPUT, content="Test"),
+        ScenarioConfig(name="test", description="desc"),
+    ])
+    def test_to_dict_covers_fields(self, obj):
+        """Test that the hand-written to_dict keeps up with the dataclass fields."""
+        expected = {f.name for f in fields(obj) if not f.name.startswith("_")}
+        assert set(obj.to_dict()) == expected
 
 
 class TestScenario:
@@ -115,6 +147,57 @@ class TestScenario:
         assert len(scenario.turns) == 1
         assert scenario.turns[0].turn_type == TurnType.STATE_CHECK
     
+    def test_user_turn_indices(self):
+        """Test that user input turns are indexed and the index is refreshed."""
+        config = ScenarioConfig(name="test", description="desc")
+        scenario = Scenario(config)
+        scenario.add_user_input("One").add_state_check("Check", ["x"]).add_user_input("Two")
+        assert scenario.user_turn_indices() == [0, 2]
+        
+        scenario.add_user_input("Three")
+        assert scenario.user_turn_indices() == [0, 2, 3]
+        
+        scenario.turns.pop()
+        assert scenario.user_turn_indices() == [0, 2]
+    
+    def test_freeze(self):
+        """Test that freezing precomputes the matcher and blocks changes."""
+        config = ScenarioConfig(name="test", description="desc")
+        scenario = Scenario(config)
+        scenario.add_user_input("One", expected_patterns=["a"]).add_user_input("Two")
+        
+        assert scenario.freeze() is scenario
+        assert scenario.frozen
+        assert scenario._matcher is not None
+        assert scenario._user_turn_indices == [0, 1]
+        
+        match = scenario.compiled_matcher()
+        assert scenario.freeze().compiled_matcher() is match
+        
+        # Scenarios with the same turn patterns share the matcher
+        other = Scenario(config)
+        other.add_user_input("Uno", expected_patterns=["a"])
+        assert other.compiled_matcher() is match
+        
+        with pytest.raises(RuntimeError):
+            scenario.add_user_input("Three")
+        with pytest.raises(RuntimeError):
+            scenario.add_validator(lambda history, scenario: True)
+        assert len(scenario) == 2
+    
+    def test_compiled_matcher_tracks_patterns(self):
+        """Test that the matcher follows pattern changes until the scenario is frozen."""
+        from types import SimpleNamespace
+        
+        scenario = Scenario(ScenarioConfig(name="test", description="desc"))
+        scenario.add_user_input("One", expected_patterns=["chips"]).add_user_input("Two")
+        match = scenario.compiled_matcher()
+        assert scenario.compiled_matcher() is match
+        
+        scenario.turns[1].expected_patterns.append("soda")
+        responses = [SimpleNamespace(content=c) for c in ("Chips", "Soda")]
+        assert scenario.compiled_matcher()(responses) == [(True,), (True,)]
+    
     def test_method_chaining(self):
         """Test that methods return self for chaining."""
         config = ScenarioConfig(name="test", description="desc")
@@ -141,6 +224,28 @@ class TestScenario:
         scenario.add_validator(custom_validator)
         assert len(scenario.validators) == 1
     
+    def test_bound_validators(self):
+        """Test that validator names and kinds are resolved once."""
+        config = ScenarioConfig(name="test", description="desc")
+        scenario = Scenario(config)
+        
+        def sync_validator(history, scenario):
+            return True
+        
+        async def async_validator(history, scenario):
+            return True
+        
+        scenario.add_validator(sync_validator).add_validator(async_validator)
+        bound = scenario.bound_validators()
+        assert [(v.fn, v.name, v.is_async) for v in bound] == [
+            (sync_validator, "sync_validator", False),
+            (async_validator, "async_validator", True),
+        ]
+        assert scenario.bound_validators() is bound
+        
+        scenario.validators.append(lambda history, scenario: True)
+        assert scenario.bound_validators()[2].name == "<lambda>"
+    
     def test_get_system_message(self):
         """Test getting system message."""
         config = ScenarioConfig(
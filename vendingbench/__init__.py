@@ -1,11 +1,27 @@
 """VendingBench: A reusable framework for testing LLM long-term coherence."""
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "0.1.0"
 
-from vendingbench.core.llm_interface import LLMInterface, LLMResponse
-from vendingbench.core.scenario import Scenario, ScenarioConfig, ConversationTurn
-from vendingbench.core.conversation import ConversationManager
-from vendingbench.core.evaluator import Evaluator, EvaluationResult
+# Public names are imported on first access (PEP 562) so that importing a
+# single submodule, e.g. the mock adapter, doesn't load the whole framework
+_EXPORTS = {
+    "LLMInterface": "vendingbench.core.llm_interface",
+    "LLMResponse": "vendingbench.core.llm_interface",
+    "Scenario": "vendingbench.core.scenario",
+    "ScenarioConfig": "vendingbench.core.scenario",
+    "ConversationTurn": "vendingbench.core.scenario",
+    "ConversationManager": "vendingbench.core.conversation",
+    "Evaluator": "vendingbench.core.evaluator",
+    "EvaluationResult": "vendingbench.core.evaluator",
+}
+
+if TYPE_CHECKING:
+    from vendingbench.core.llm_interface import LLMInterface, LLMResponse
+    from vendingbench.core.scenario import Scenario, ScenarioConfig, ConversationTurn
+    from vendingbench.core.conversation import ConversationManager
+    from vendingbench.core.evaluator import Evaluator, EvaluationResult
 
 __all__ = [
     "LLMInterface",
@@ -17,3 +33,18 @@ __all__ = [
     "Evaluator",
     "EvaluationResult",
 ]
+
+
+def __getattr__(name: str):
+    """Import a public name on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List module attributes including the lazily imported names."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,55 @@
+"""Shared HTTP client for async adapters."""
+import asyncio
+import importlib.util
+import weakref
+
+# Connection pools are tied to the event loop that opened them
+_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+MAX_KEEPALIVE_CONNECTIONS = 32
+
+
+def get_async_client():
+    """Get the shared ``httpx.AsyncClient`` for the running event loop.
+    
+    The client keeps connections alive between requests so concurrent
+    scenarios reuse TCP/TLS sessions, and multiplexes requests over HTTP/2
+    when the ``h2`` package is installed.
+    
+    The client stays open until ``aclose_async_client`` is awaited on the
+    same loop.
+    
+    Returns:
+        An httpx.AsyncClient bound to the current event loop
+        
+    Raises:
+        RuntimeError: If called outside a running event loop
+    """
+    try:
+        # Newer openai releases are built on httpx2, which keeps httpx's API
+        import httpx2 as httpx
+    except ImportError:
+        import httpx
+    
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+            timeout=httpx.Timeout(600.0, connect=5.0),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """Close the shared ``httpx.AsyncClient`` of the running event loop.
+    
+    Call this before the loop ends (e.g. at the end of the coroutine passed
+    to ``asyncio.run``) so its pooled connections are shut down cleanly. A
+    later ``get_async_client`` call on the same loop opens a new client.
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
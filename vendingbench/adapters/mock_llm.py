@@ -1,5 +1,5 @@
 """Mock LLM adapter for testing purposes."""
-from typing import List, Dict, Optional
+from typing import List, Mapping, Optional, Sequence
 from vendingbench.core.llm_interface import LLMInterface, LLMResponse
 
 
@@ -25,7 +25,7 @@ class MockLLM(LLMInterface):
     
     def generate(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Mapping[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         **kwargs
@@ -33,7 +33,7 @@ class MockLLM(LLMInterface):
         """Generate a mock response.
         
         Args:
-            messages: List of messages
+            messages: Sequence of messages
             temperature: Ignored for mock
             max_tokens: Ignored for mock
             **kwargs: Additional parameters
@@ -44,19 +44,27 @@ class MockLLM(LLMInterface):
         if not self.validate_messages(messages):
             raise ValueError("Invalid message format")
         
-        self.call_count += 1
+        return self.generate_trusted(messages, temperature, max_tokens, **kwargs)
+    
+    def generate_trusted(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate a mock response without validating messages.
         
-        # Return predefined response if available
-        if self.responses and self.response_index < len(self.responses):
-            content = self.responses[self.response_index]
-            self.response_index += 1
-        else:
-            # Echo the last user message
-            user_messages = [m for m in messages if m["role"] == "user"]
-            if user_messages:
-                content = f"Mock response to: {user_messages[-1]['content']}"
-            else:
-                content = "Mock response with no user input"
+        Args:
+            messages: Sequence of valid messages
+            temperature: Ignored for mock
+            max_tokens: Ignored for mock
+            **kwargs: Additional parameters
+            
+        Returns:
+            LLMResponse with mock content
+        """
+        content = self._generate_internal(messages)
         
         return LLMResponse(
             content=content,
@@ -68,9 +76,31 @@ class MockLLM(LLMInterface):
             }
         )
     
+    async def agenerate(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate a mock response from a coroutine.
+        
+        The mock never blocks, so this simply delegates to ``generate``.
+        
+        Args:
+            messages: Sequence of messages
+            temperature: Ignored for mock
+            max_tokens: Ignored for mock
+            **kwargs: Additional parameters
+            
+        Returns:
+            LLMResponse with mock content
+        """
+        return self.generate(messages, temperature, max_tokens, **kwargs)
+    
     def generate_stream(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Mapping[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         **kwargs
@@ -78,7 +108,7 @@ class MockLLM(LLMInterface):
         """Generate a streaming mock response.
         
         Args:
-            messages: List of messages
+            messages: Sequence of messages
             temperature: Ignored for mock
             max_tokens: Ignored for mock
             **kwargs: Additional parameters
@@ -86,12 +116,38 @@ class MockLLM(LLMInterface):
         Yields:
             Chunks of the mock response
         """
-        response = self.generate(messages, temperature, max_tokens, **kwargs)
+        if not self.validate_messages(messages):
+            raise ValueError("Invalid message format")
+        
+        # Only the text is streamed, so skip building an LLMResponse
+        content = self._generate_internal(messages)
         
         # Simulate streaming by yielding words
-        words = response.content.split()
-        for word in words:
-            yield word + " "
+        yield from (word + " " for word in content.split())
+    
+    def _generate_internal(self, messages: Sequence[Mapping[str, str]]) -> str:
+        """Count a call and pick the mock reply for it.
+        
+        Args:
+            messages: Sequence of valid messages
+            
+        Returns:
+            The next predefined response, or an echo of the last user message
+        """
+        self.call_count += 1
+        
+        # Return predefined response if available
+        responses = self.responses
+        index = self.response_index
+        if index < len(responses):
+            self.response_index = index + 1
+            return responses[index]
+        
+        # Echo the last user message, scanning back from the end
+        for message in reversed(messages):
+            if message["role"] == "user":
+                return f"Mock response to: {message['content']}"
+        return "Mock response with no user input"
     
     def reset(self):
         """Reset the mock LLM state."""
@@ -1,9 +1,25 @@
 """OpenAI adapter for vendingbench."""
-from typing import List, Dict, Optional
+import asyncio
+import json
+import re
+import time
+from typing import List, Dict, Any, Awaitable, Callable, Mapping, Optional, Sequence, Set
 
+from vendingbench.adapters._http import aclose_async_client, get_async_client
 from vendingbench.core.llm_interface import LLMInterface, LLMResponse
 
 
+BATCH_SYSTEM_PROMPT = (
+    "You will receive {n} independent conversations, each introduced by a "
+    "line such as <<<CONVERSATION 1>>>. Answer each conversation separately "
+    "as the assistant. Start each answer with a line holding only its marker, "
+    "in order, one per answer:\n"
+    "<<<ANSWER 1>>>\n<answer to conversation 1>\n<<<ANSWER 2>>>\n..."
+)
+
+_BATCH_MARKER = re.compile(r"^<<<ANSWER (\d+)>>>[ \t]*$", re.MULTILINE)
+
+
 class OpenAIAdapter(LLMInterface):
     """Adapter for OpenAI models.
     
@@ -11,15 +27,24 @@ class OpenAIAdapter(LLMInterface):
     Requires: pip install openai
     """
     
-    def __init__(self, model_name: str = "gpt-4", api_key: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        model_name: str = "gpt-4",
+        api_key: Optional[str] = None,
+        pack_batches: bool = False,
+        **kwargs
+    ):
         """Initialize the OpenAI adapter.
         
         Args:
             model_name: Name of the OpenAI model (e.g., 'gpt-4', 'gpt-3.5-turbo')
             api_key: OpenAI API key. If None, will use OPENAI_API_KEY environment variable
+            pack_batches: Answer ``batch_generate`` prompts with one packed API
+                call instead of one call per prompt (see ``batch_generate``)
             **kwargs: Additional configuration
         """
         super().__init__(model_name, **kwargs)
+        self.pack_batches = pack_batches
         
         try:
             from openai import OpenAI
@@ -30,10 +55,95 @@ class OpenAIAdapter(LLMInterface):
         
         # OpenAI client will automatically use OPENAI_API_KEY env var if api_key is None
         self.client = OpenAI(api_key=api_key)
+        self._api_key = api_key
+        self._async_client = None
+        self._async_http_client = None
+    
+    @property
+    def async_client(self):
+        """``AsyncOpenAI`` client used by ``agenerate``.
+        
+        The client is created lazily on top of the shared keep-alive HTTP
+        client for the running event loop, and rebuilt if that changes.
+        Await ``aclose`` before the loop ends to close its connections.
+        """
+        http_client = get_async_client()
+        if self._async_client is None or self._async_http_client is not http_client:
+            from openai import AsyncOpenAI
+            
+            self._async_client = AsyncOpenAI(api_key=self._api_key, http_client=http_client)
+            self._async_http_client = http_client
+        return self._async_client
+    
+    async def aclose(self):
+        """Close the running event loop's shared HTTP client.
+        
+        Await this once the adapter's async calls on the loop are done,
+        before the loop ends; other adapters on the same loop share the
+        client. A later ``agenerate`` opens a new one.
+        """
+        self._async_client = None
+        self._async_http_client = None
+        await aclose_async_client()
+    
+    def _build_params(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Build the keyword arguments for ``chat.completions.create``.
+        
+        Args:
+            messages: Sequence of message dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional OpenAI parameters (a ``model`` entry is
+                ignored in favour of the adapter's model)
+                
+        Returns:
+            Dictionary of API parameters
+        """
+        # Built in one literal; the adapter's own fields win over kwargs
+        api_params = {
+            **kwargs,
+            "model": self.model_name,
+            # The client serializes messages as JSON, which needs a real list
+            "messages": messages if isinstance(messages, list) else list(messages),
+            "temperature": temperature,
+        }
+        if max_tokens is not None:
+            api_params["max_tokens"] = max_tokens
+        
+        return api_params
+    
+    def _to_llm_response(self, response, choice_index: int = 0) -> LLMResponse:
+        """Convert an OpenAI chat completion into an LLMResponse.
+        
+        Args:
+            response: Chat completion returned by the OpenAI client
+            choice_index: Which of the returned choices to convert
+            
+        Returns:
+            LLMResponse containing the generated content
+        """
+        choice = response.choices[choice_index]
+        metadata: Dict[str, Any] = {"finish_reason": choice.finish_reason}
+        # Streamed and some proxied completions carry no usage
+        if response.usage is not None:
+            metadata["usage"] = _usage_dict(response.usage)
+        return LLMResponse(
+            # None for tool calls and refusals
+            content=choice.message.content or "",
+            model=self.model_name,
+            metadata=metadata,
+            raw_response=response,
+        )
     
     def generate(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Mapping[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         **kwargs
@@ -41,7 +151,7 @@ class OpenAIAdapter(LLMInterface):
         """Generate a response using OpenAI API.
         
         Args:
-            messages: List of message dictionaries
+            messages: Sequence of message dictionaries
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
             **kwargs: Additional OpenAI parameters
@@ -52,42 +162,162 @@ class OpenAIAdapter(LLMInterface):
         if not self.validate_messages(messages):
             raise ValueError("Invalid message format")
         
-        # Build API parameters
-        api_params = {
-            "model": self.model_name,
-            "messages": messages,
-            "temperature": temperature,
-        }
-        
-        if max_tokens is not None:
-            api_params["max_tokens"] = max_tokens
+        return self.generate_trusted(messages, temperature, max_tokens, **kwargs)
+    
+    def generate_trusted(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate a response using OpenAI API without validating messages.
         
-        # Add any additional parameters
-        api_params.update(kwargs)
+        Args:
+            messages: Sequence of valid message dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional OpenAI parameters
+            
+        Returns:
+            LLMResponse containing the generated content
+        """
+        api_params = self._build_params(messages, temperature, max_tokens, **kwargs)
         
         # Call OpenAI API
         response = self.client.chat.completions.create(**api_params)
         
-        # Extract content
-        content = response.choices[0].message.content
+        return self._to_llm_response(response)
+    
+    async def agenerate(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate a response using the async OpenAI client.
         
-        return LLMResponse(
-            content=content,
-            model=self.model_name,
-            metadata={
-                "finish_reason": response.choices[0].finish_reason,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens,
-                },
-            },
-            raw_response=response,
+        Args:
+            messages: Sequence of message dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional OpenAI parameters
+            
+        Returns:
+            LLMResponse containing the generated content
+        """
+        if not self.validate_messages(messages):
+            raise ValueError("Invalid message format")
+        
+        api_params = self._build_params(messages, temperature, max_tokens, **kwargs)
+        
+        response = await self.async_client.chat.completions.create(**api_params)
+        
+        return self._to_llm_response(response)
+    
+    def batch_generate(
+        self,
+        prompts: Sequence[Sequence[Mapping[str, str]]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """Generate responses for several independent conversations.
+        
+        By default each prompt gets its own API call. With ``pack_batches``
+        enabled the conversations are instead packed into one user message
+        under ``BATCH_SYSTEM_PROMPT`` and the reply is split on its
+        ``<<<ANSWER i>>>`` marker lines, so N prompts cost one call.
+        
+        Packing changes what the model sees: each conversation, including
+        its system prompt, is flattened into text inside a single user turn
+        and answered alongside the others. Its answers are therefore not
+        comparable with those of ``generate`` on the same messages, which is
+        why packing is opt-in. If the reply does not hold exactly one marker
+        per prompt, in order, the prompts are answered individually instead.
+        
+        Args:
+            prompts: Sequence of message lists, one per independent conversation
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate per answer; a packed call
+                is allowed ``max_tokens`` for each prompt it holds
+            **kwargs: Additional OpenAI parameters
+            
+        Returns:
+            One LLMResponse per prompt, in the same order. Packed answers
+            carry an even share of the call's token ``usage``, so summing
+            usage over the responses gives the call's total.
+        """
+        if not self.pack_batches or len(prompts) <= 1:
+            return super().batch_generate(prompts, temperature, max_tokens, **kwargs)
+        
+        for messages in prompts:
+            if not self.validate_messages(messages):
+                raise ValueError("Invalid message format")
+        
+        n = len(prompts)
+        packed = "\n".join(
+            f"<<<CONVERSATION {i}>>>\n"
+            + "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+            for i, messages in enumerate(prompts, 1)
         )
+        batch_messages = [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT.format(n=n)},
+            {"role": "user", "content": packed},
+        ]
+        
+        batch_max_tokens = max_tokens * n if max_tokens is not None else None
+        api_params = self._build_params(batch_messages, temperature, batch_max_tokens, **kwargs)
+        response = self.client.chat.completions.create(**api_params)
+        
+        answers = self._split_batch(response.choices[0].message.content or "", n)
+        if answers is None:
+            return super().batch_generate(prompts, temperature, max_tokens, **kwargs)
+        
+        finish_reason = response.choices[0].finish_reason
+        usages = _split_usage(response.usage, n)
+        responses = []
+        for i, answer in enumerate(answers):
+            metadata: Dict[str, Any] = {
+                "finish_reason": finish_reason,
+                "batch_index": i,
+                "batch_size": n,
+            }
+            if usages is not None:
+                metadata["usage"] = usages[i]
+            responses.append(
+                LLMResponse(
+                    content=answer,
+                    model=self.model_name,
+                    metadata=metadata,
+                    raw_response=response,
+                )
+            )
+        return responses
+    
+    @staticmethod
+    def _split_batch(content: str, expected: int) -> Optional[List[str]]:
+        """Split a packed reply on its ``<<<ANSWER i>>>`` marker lines.
+        
+        Args:
+            content: Assistant reply to the packed prompt
+            expected: Number of answers that should be present
+            
+        Returns:
+            The answers, or None unless the reply holds exactly the markers
+            1 to ``expected``, once each and in order
+        """
+        parts = _BATCH_MARKER.split(content)
+        # parts is [preamble, idx1, text1, idx2, text2, ...]
+        indices = [int(idx) for idx in parts[1::2]]
+        if indices != list(range(1, expected + 1)):
+            return None
+        return [text.strip() for text in parts[2::2]]
     
     def generate_stream(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Mapping[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         **kwargs
@@ -95,7 +325,7 @@ class OpenAIAdapter(LLMInterface):
         """Generate a streaming response using OpenAI API.
         
         Args:
-            messages: List of message dictionaries
+            messages: Sequence of message dictionaries
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
             **kwargs: Additional OpenAI parameters
@@ -103,26 +333,339 @@ class OpenAIAdapter(LLMInterface):
         Yields:
             Chunks of the response as they are generated
         """
+        stream = self._create_stream(messages, temperature, max_tokens, **kwargs)
+        
+        for chunk in stream:
+            if chunk.choices[0].delta.content is not None:
+                yield chunk.choices[0].delta.content
+    
+    def generate_full_streamed(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Stream a response from the OpenAI API and return it whole.
+        
+        Streaming lets the first tokens arrive early (and keeps long
+        generations from hitting read timeouts), while the chunks are
+        collected in a list and joined once at the end rather than being
+        concatenated by the caller.
+        
+        Args:
+            messages: Sequence of message dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional OpenAI parameters
+            
+        Returns:
+            LLMResponse containing the full generated content
+        """
+        stream = self._create_stream(messages, temperature, max_tokens, **kwargs)
+        
+        parts: List[str] = []
+        append = parts.append
+        finish_reason = None
+        num_chunks = 0
+        for chunk in stream:
+            num_chunks += 1
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            content = choice.delta.content
+            if content is not None:
+                append(content)
+            if choice.finish_reason is not None:
+                finish_reason = choice.finish_reason
+        
+        return LLMResponse(
+            content="".join(parts),
+            model=self.model_name,
+            metadata={
+                "finish_reason": finish_reason,
+                "streamed": True,
+                "num_chunks": num_chunks,
+            },
+        )
+    
+    def _create_stream(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        **kwargs
+    ):
+        """Validate messages and open a streaming chat completion.
+        
+        Args:
+            messages: Sequence of message dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional OpenAI parameters
+            
+        Returns:
+            Iterator over the completion chunks
+        """
         if not self.validate_messages(messages):
             raise ValueError("Invalid message format")
         
-        # Build API parameters
-        api_params = {
-            "model": self.model_name,
-            "messages": messages,
-            "temperature": temperature,
-            "stream": True,
-        }
+        kwargs.setdefault("stream", True)
+        api_params = self._build_params(messages, temperature, max_tokens, **kwargs)
         
-        if max_tokens is not None:
-            api_params["max_tokens"] = max_tokens
+        # Stream from OpenAI API
+        return self.client.chat.completions.create(**api_params)
+
+
+def _usage_dict(usage) -> Dict[str, int]:
+    """Convert an OpenAI usage object into a plain dictionary.
+    
+    Args:
+        usage: ``usage`` of a chat completion
         
-        # Add any additional parameters
-        api_params.update(kwargs)
+    Returns:
+        Dictionary with prompt, completion and total token counts
+    """
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+def _split_usage(usage, n: int) -> Optional[List[Dict[str, int]]]:
+    """Share the token usage of one API call between ``n`` responses.
+    
+    Each count is divided evenly, with the remainder going to the first
+    responses, so the shares add up to the call's usage.
+    
+    Args:
+        usage: ``usage`` of a chat completion, or None
+        n: Number of responses the call produced
         
-        # Stream from OpenAI API
-        stream = self.client.chat.completions.create(**api_params)
+    Returns:
+        One usage dictionary per response, or None if the call had no usage
+    """
+    if usage is None:
+        return None
+    
+    shares: List[Dict[str, int]] = [{} for _ in range(n)]
+    for key, total in _usage_dict(usage).items():
+        base, extra = divmod(total, n)
+        for i, share in enumerate(shares):
+            share[key] = base + (1 if i < extra else 0)
+    return shares
+
+
+class _TokenBucket:
+    """Token bucket limiting how many requests start per second."""
+    
+    def __init__(
+        self,
+        rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        """Initialize the bucket.
         
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                yield chunk.choices[0].delta.content
+        Args:
+            rate: Requests per second; also the burst capacity (minimum 1)
+            clock: Monotonic clock returning seconds
+            sleep: Coroutine function used to wait for ``clock`` to advance
+        """
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        while True:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await self._sleep((1 - self._tokens) / self.rate)
+
+
+class BatchingOpenAIAdapter(OpenAIAdapter):
+    """OpenAI adapter that merges concurrent identical ``agenerate`` calls.
+    
+    Calls arriving within ``batch_window_ms`` of each other are collected.
+    Identical requests in a window (same messages and parameters) are
+    merged into a single API call with ``n`` set to the number of callers,
+    and the call's token ``usage`` is split evenly between their responses.
+    Different requests are still sent as separate, concurrent API calls.
+    An optional token bucket caps the request rate.
+    
+    This only saves requests when the same prompt is sampled repeatedly,
+    e.g. when several runs of one scenario are awaited together. Every call
+    waits up to ``batch_window_ms`` before it is sent, so for distinct
+    prompts the plain ``OpenAIAdapter`` is faster.
+    
+    Synchronous ``generate`` calls are not queued: merging only helps when
+    several requests are in flight at once, which requires the async API
+    (see ``arun_scenarios``).
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "gpt-4",
+        api_key: Optional[str] = None,
+        batch_window_ms: float = 10.0,
+        requests_per_second: Optional[float] = None,
+        **kwargs
+    ):
+        """Initialize the batching adapter.
+        
+        Args:
+            model_name: Name of the OpenAI model
+            api_key: OpenAI API key. If None, will use OPENAI_API_KEY environment variable
+            batch_window_ms: How long to collect requests before dispatching them
+            requests_per_second: Optional cap on API requests per second
+            **kwargs: Additional configuration
+        """
+        super().__init__(model_name=model_name, api_key=api_key, **kwargs)
+        self.batch_window_ms = batch_window_ms
+        self.requests_per_second = requests_per_second
+        self._bucket = _TokenBucket(requests_per_second) if requests_per_second else None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        # In-flight _dispatch tasks; the event loop only keeps weak references
+        self._dispatches: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def agenerate(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Queue a request for the next batch and wait for its response.
+        
+        Args:
+            messages: Sequence of message dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional OpenAI parameters
+            
+        Returns:
+            LLMResponse containing the generated content
+        """
+        if not self.validate_messages(messages):
+            raise ValueError("Invalid message format")
+        
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        if (
+            queue is None
+            or self._loop is not loop
+            or self._batcher is None
+            or self._batcher.done()
+        ):
+            # Queues and tasks belong to one event loop; restart per loop
+            self._loop = loop
+            queue = self._queue = asyncio.Queue()
+            self._batcher = loop.create_task(self._run_batcher())
+        
+        future: "asyncio.Future[LLMResponse]" = loop.create_future()
+        api_params = self._build_params(messages, temperature, max_tokens, **kwargs)
+        queue.put_nowait((api_params, future))
+        return await future
+    
+    async def aclose(self):
+        """Stop batching, cancel every request that has not completed and
+        close the loop's shared HTTP client.
+        
+        Callers still awaiting ``agenerate`` receive ``CancelledError``. The
+        adapter can be used again afterwards; a new batcher is started on
+        the next ``agenerate`` call.
+        """
+        tasks = [task for task in (self._batcher, *self._dispatches) if task is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Requests queued but not yet picked up by the batcher
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        
+        self._batcher = None
+        self._dispatches.clear()
+        await super().aclose()
+    
+    async def _run_batcher(self):
+        """Collect queued requests per window and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                await asyncio.sleep(self.batch_window_ms / 1000)
+            except asyncio.CancelledError:
+                batch[0][1].cancel()
+                raise
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            # Merge identical requests into one call with n=len(group)
+            groups: Dict[str, List] = {}
+            for api_params, future in batch:
+                if "n" in api_params:
+                    key = str(id(future))
+                else:
+                    key = json.dumps(api_params, sort_keys=True, default=str)
+                groups.setdefault(key, []).append((api_params, future))
+            
+            for group in groups.values():
+                task = loop.create_task(self._dispatch(group))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, group: List):
+        """Send one API call for a group of identical requests.
+        
+        Every future in the group is resolved: with its response, with the
+        exception raised by the call or the conversion of its choice, or
+        cancelled if this task is.
+        
+        Args:
+            group: List of (api_params, future) pairs sharing the same params
+        """
+        api_params = dict(group[0][0])
+        if len(group) > 1:
+            api_params["n"] = len(group)
+        
+        try:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            response = await self.async_client.chat.completions.create(**api_params)
+            
+            usages = _split_usage(response.usage, len(group))
+            llm_responses = []
+            for i in range(len(group)):
+                llm_response = self._to_llm_response(response, i)
+                llm_response.metadata["batch_size"] = len(group)
+                if usages is not None:
+                    # Each caller gets its share of the merged call's usage
+                    llm_response.metadata["usage"] = usages[i]
+                llm_responses.append(llm_response)
+        except asyncio.CancelledError:
+            for _, future in group:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), llm_response in zip(group, llm_responses):
+            if not future.done():
+                future.set_result(llm_response)
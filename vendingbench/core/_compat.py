@@ -0,0 +1,5 @@
+"""Compatibility helpers for the supported Python versions."""
+import sys
+
+# dataclass(slots=True) drops the per-instance __dict__ but needs Python 3.10+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
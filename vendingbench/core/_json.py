@@ -0,0 +1,125 @@
+"""JSON encoding using the fastest available backend."""
+import json
+import math
+from typing import Any, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+msgspec = None
+if orjson is None:
+    # Only a fallback, so not imported (and paid for) next to orjson
+    try:
+        import msgspec  # type: ignore[no-redef]
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+
+
+def _unsupported(obj: Any) -> Any:
+    """Reject a value the fast encoders would otherwise convert.
+    
+    Used as orjson's ``default`` and msgspec's ``enc_hook``.
+    
+    Args:
+        obj: Value the encoder has no native handling for
+        
+    Raises:
+        TypeError: Always, as ``json.dumps`` does for such values
+    """
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _is_plain(obj: Any) -> bool:
+    """Check whether a structure holds only built-in JSON types.
+    
+    Only exact types are accepted, so subclasses (``IntEnum``, ``str``
+    subclasses, ...) are left to the stdlib encoder like anything else.
+    
+    Args:
+        obj: Object to inspect
+        
+    Returns:
+        True if every key and value is a ``str``, ``int``, ``bool``,
+        finite ``float``, ``None``, ``dict``, ``list`` or ``tuple``
+    """
+    isfinite = math.isfinite
+    # Wrapped so a top-level scalar is checked like any nested value
+    stack: List[Any] = [(obj,)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        item = pop()
+        if type(item) is dict:
+            for key in item:
+                cls = type(key)
+                if cls is not str and not (
+                    cls is int or cls is bool or key is None or (cls is float and isfinite(key))
+                ):
+                    return False
+            values = item.values()
+        else:
+            values = item
+        for value in values:
+            cls = type(value)
+            if cls is str or cls is int or cls is bool or value is None:
+                continue
+            if cls is dict or cls is list or cls is tuple:
+                push(value)
+            elif cls is not float or not isfinite(value):
+                return False
+    return True
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize an object to UTF-8 JSON.
+    
+    Uses orjson or msgspec when installed (in that order) and the stdlib
+    encoder otherwise. Input the fast encoders would reject or change
+    (integers beyond 64 bits, non-string keys msgspec can't handle, NaN
+    and infinity, which they write as ``null``) is encoded by the stdlib,
+    and values ``json.dumps`` rejects (datetimes, dataclasses, UUIDs,
+    plain enums, ...) raise ``TypeError`` whichever backend is installed.
+    
+    The output is equivalent JSON, not byte-identical to ``json.dumps``:
+    the fast encoders write non-ASCII characters (including U+007F and
+    U+2028) unescaped and spell some floats differently (``1e16`` for
+    ``1e+16``, ``1e-7`` for ``1e-07``). Layout (separators, two-space
+    indentation) is the same.
+    
+    Args:
+        obj: JSON-serializable object
+        indent: Indent nested structures by two spaces instead of emitting
+            compact JSON
+            
+    Returns:
+        Encoded JSON document
+    """
+    data = None
+    try:
+        if orjson is not None:
+            # Datetimes and dataclasses go to _unsupported instead of being encoded
+            option = (
+                orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+                | (orjson.OPT_INDENT_2 if indent else 0)
+            )
+            data = orjson.dumps(obj, default=_unsupported, option=option)
+        elif msgspec is not None:
+            data = msgspec.json.encode(obj, enc_hook=_unsupported)
+            if indent:
+                data = msgspec.json.format(data, indent=2)
+    except (TypeError, OverflowError):
+        data = None
+    # Both encoders natively write some types json rejects (orjson: UUID and
+    # Enum; msgspec: also datetimes, dataclasses, bytes, Decimal), so the
+    # input is checked once it is known to be acyclic and encodable; anything
+    # else goes to json, which accepts or rejects it as it always has
+    if data is not None and _is_plain(obj):
+        return data
+    
+    if indent:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
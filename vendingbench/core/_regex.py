@@ -0,0 +1,155 @@
+"""Case-insensitive regex compilation with optional faster backends."""
+import re
+import sys
+from typing import FrozenSet, Optional
+
+try:
+    import pcre2
+except ImportError:  # pragma: no cover - optional dependency
+    pcre2 = None
+
+try:
+    import regex
+except ImportError:  # pragma: no cover - optional dependency
+    regex = None
+
+
+# Syntax PCRE2 or the regex package read
+# differently from re: \Z also matches before a final newline, "{,n}" is a
+# literal and "[:alpha:]" inside a set is a POSIX class
+_DIVERGENT_SYNTAX = ("\\Z", "{,", "[:")
+
+# Letters re matches case-insensitively against "i" but other engines don't
+_DOTTED_DOTLESS_I = ("İ", "ı")
+
+# Non-ASCII characters for which re.IGNORECASE and a str.lower() comparison
+# disagree: "İ" lowercases to two characters, and the rest belong to re's
+# extra case equivalences (e.g. "ſ" with "s", "µ" with "μ", "ς" with "σ").
+# Generated from re._casefix and the Unicode database of Python 3.11, and
+# checked by scanning every code point on 3.8 through 3.13: it is the exact
+# set on 3.9+ and a superset on 3.8, whose re has fewer equivalences. Other
+# versions may add equivalences, so there every non-ASCII text is searched
+# with the regex instead (computing the set at import takes about 0.5s).
+_LOWER_UNLIKE_RE: Optional[FrozenSet[str]] = frozenset(
+    "\u00b5\u0130\u0131\u017f\u0345\u0390\u0392\u0395\u0398\u0399\u039a\u039c"
+    "\u03a0\u03a1\u03a3\u03a6\u03b0\u03b2\u03b5\u03b8\u03b9\u03ba\u03bc\u03c0"
+    "\u03c1\u03c2\u03c3\u03c6\u03d0\u03d1\u03d5\u03d6\u03f0\u03f1\u03f4\u03f5"
+    "\u0412\u0414\u041e\u0421\u0422\u042a\u0432\u0434\u043e\u0441\u0442\u044a"
+    "\u0462\u0463\u1c80\u1c81\u1c82\u1c83\u1c84\u1c85\u1c86\u1c87\u1c88\u1e60"
+    "\u1e61\u1e9b\u1fbe\u1fd3\u1fe3\ua64a\ua64b\ufb05\ufb06"
+)
+if not (3, 8) <= sys.version_info[:2] <= (3, 13):  # pragma: no cover - unchecked version
+    _LOWER_UNLIKE_RE = None
+
+
+def portable(pattern: str) -> bool:
+    """Check whether other regex engines read a pattern the same way as ``re``.
+    
+    Patterns using syntax from ``_DIVERGENT_SYNTAX`` are not portable, and
+    neither are non-ASCII patterns, since the engines' Unicode case folding
+    is not guaranteed to agree.
+    
+    Args:
+        pattern: Regex pattern string
+        
+    Returns:
+        True if the pattern may be compiled with another engine
+    """
+    return pattern.isascii() and not any(s in pattern for s in _DIVERGENT_SYNTAX)
+
+
+def folds_like_re(text: str) -> bool:
+    """Check whether case-insensitive matching of a text is engine-independent.
+    
+    Args:
+        text: Text to be searched
+        
+    Returns:
+        False if the text contains a Turkish dotted or dotless i
+    """
+    return text.isascii() or not any(c in text for c in _DOTTED_DOTLESS_I)
+
+
+def lowers_like_re(text: str) -> bool:
+    """Check whether ``str.lower()`` compares a text like ``re.IGNORECASE``.
+    
+    A literal pattern found case-insensitively by ``re`` is also a
+    substring of the lowered text, unless the pattern or the text contains
+    a character from ``_LOWER_UNLIKE_RE``.
+    
+    Args:
+        text: Pattern or text to check
+        
+    Returns:
+        False if the text contains a character lowercased unlike ``re``, or
+        is not ASCII on a Python version the table was not checked against
+    """
+    if text.isascii():
+        return True
+    return _LOWER_UNLIKE_RE is not None and _LOWER_UNLIKE_RE.isdisjoint(text)
+
+
+class _FastPattern:
+    """A pattern compiled with a faster backend, searching with ``re`` where they differ."""
+    
+    __slots__ = ("pattern", "_fast_search", "_re_search")
+    
+    def __init__(self, fast, compiled: "re.Pattern"):
+        """Initialize the pattern.
+        
+        Args:
+            fast: Pattern compiled by the faster backend
+            compiled: The same pattern compiled by ``re``
+        """
+        self.pattern = compiled.pattern
+        self._fast_search = fast.search
+        self._re_search = compiled.search
+    
+    def search(self, text: str):
+        """Search a text, like ``re.Pattern.search``."""
+        if folds_like_re(text):
+            return self._fast_search(text)
+        return self._re_search(text)
+
+
+def compile_caseless(pattern: str):
+    """Compile a case-insensitive regex with the fastest available backend.
+    
+    ``re`` decides whether a pattern is valid, so every backend accepts
+    the same set of patterns. Valid patterns are then compiled with PCRE2
+    (JIT-compiled) or the ``regex`` package when installed, in that order;
+    a pattern a backend rejects falls through to the next one. Patterns
+    that aren't ``portable`` stay with ``re``, and texts whose case folding
+    differs between engines are searched with ``re``, so the verdict does
+    not depend on which backend is installed.
+    
+    Args:
+        pattern: Regex pattern string
+        
+    Returns:
+        A compiled pattern object with a ``search(text)`` method
+        
+    Raises:
+        re.error: If the pattern is not a valid ``re`` regex
+    """
+    compiled = re.compile(pattern, re.IGNORECASE)
+    if not portable(pattern):
+        return compiled
+    
+    if pcre2 is not None:
+        try:
+            fast = pcre2.compile(pattern, flags=pcre2.IGNORECASE | pcre2.UNICODE)
+        except pcre2.error:
+            # Syntax PCRE2 doesn't share with re
+            pass
+        else:
+            fast.jit_compile()
+            return _FastPattern(fast, compiled)
+    
+    if regex is not None:
+        try:
+            return _FastPattern(regex.compile(pattern, regex.IGNORECASE | regex.VERSION0), compiled)
+        except regex.error:
+            pass
+    
+    return compiled
@@ -1,14 +1,59 @@
 """Conversation management for running scenarios."""
-from typing import List, Dict, Any, Optional
+import asyncio
+import functools
+import sys
+from collections.abc import Sequence
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Type
 from dataclasses import dataclass, field
 from datetime import datetime
 
-from vendingbench.core.llm_interface import LLMInterface, LLMResponse
+from vendingbench.core._compat import DATACLASS_SLOTS
+from vendingbench.core.llm_interface import _VALID_ROLES, LLMInterface, LLMResponse
 from vendingbench.core.scenario import Scenario, TurnType
 
 
-@dataclass
-class ConversationHistory:
+class _MessagesView(Sequence):
+    """Read-only, non-copying view of a message list."""
+    
+    __slots__ = ("_messages",)
+    
+    def __init__(self, messages: List[Dict[str, str]]):
+        """Wrap a message list."""
+        self._messages = messages
+    
+    def __getitem__(self, index):
+        """Get a message (or a copied slice of messages)."""
+        return self._messages[index]
+    
+    def __len__(self) -> int:
+        """Return the number of messages."""
+        return len(self._messages)
+    
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        """Iterate over the messages."""
+        return iter(self._messages)
+    
+    def __reversed__(self) -> Iterator[Dict[str, str]]:
+        """Iterate over the messages from the most recent."""
+        return reversed(self._messages)
+    
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"_MessagesView({self._messages!r})"
+
+
+class _HistoryCaches:
+    """Private caches of a ConversationHistory, kept out of its dataclass fields.
+    
+    As slots of a base class they don't appear in ``dataclasses.asdict``,
+    ``repr`` or equality.
+    """
+    
+    __slots__ = ("_started_at_iso",)
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ConversationHistory(_HistoryCaches):
     """Manages the history of a conversation."""
     
     messages: List[Dict[str, str]] = field(default_factory=list)
@@ -16,23 +61,93 @@ class ConversationHistory:
     metadata: Dict[str, Any] = field(default_factory=dict)
     started_at: datetime = field(default_factory=datetime.now)
     
+    def __post_init__(self):
+        """Start with an empty cache."""
+        # (started_at, its ISO string) as of the last started_at_iso lookup
+        self._started_at_iso: Optional[Tuple[datetime, str]] = None
+    
     def add_message(self, role: str, content: str):
         """Add a message to the history.
         
         Args:
             role: Role of the message sender (system/user/assistant)
             content: Content of the message
+            
+        Raises:
+            ValueError: If the role is unknown or the content is not a string
         """
-        self.messages.append({"role": role, "content": content})
+        # Validate once here so LLM calls can skip re-validating the history
+        if role not in _VALID_ROLES or not isinstance(content, str):
+            raise ValueError(
+                f"Invalid message (role={role!r}, content type={type(content).__name__})"
+            )
+        # Roles come from a tiny fixed set; interning makes every message
+        # share one string object per role
+        self.messages.append({"role": sys.intern(role), "content": content})
+    
+    def add_messages_bulk(self, pairs: Iterable[Tuple[str, str]]):
+        """Add several messages at once, e.g. when replaying a conversation.
+        
+        Every message is validated before any is added, so a bad pair leaves
+        the history unchanged.
+        
+        Args:
+            pairs: (role, content) pairs in conversation order
+            
+        Raises:
+            ValueError: If any role is unknown or any content is not a string
+        """
+        valid_roles = _VALID_ROLES
+        intern = sys.intern
+        new_messages: List[Dict[str, str]] = []
+        append = new_messages.append
+        for role, content in pairs:
+            if role not in valid_roles or not isinstance(content, str):
+                raise ValueError(
+                    f"Invalid message (role={role!r}, content type={type(content).__name__})"
+                )
+            append({"role": intern(role), "content": content})
+        self.messages.extend(new_messages)
     
     def add_response(self, response: LLMResponse):
         """Add an LLM response to the history.
         
+        A response without content (a tool call or refusal) is recorded as
+        an empty assistant message; the response itself is not modified.
+        
         Args:
             response: The LLM response to add
         """
         self.responses.append(response)
-        self.add_message("assistant", response.content)
+        self.add_message("assistant", response.content or "")
+    
+    def trim(self, max_messages: int, keep_system: bool = True) -> int:
+        """Drop the oldest messages so at most ``max_messages`` remain.
+        
+        Useful for keeping long scenarios inside a model's context window.
+        The oldest messages are removed with one slice deletion, a single
+        memmove regardless of how many are dropped. ``responses`` is left
+        untouched so evaluation still sees every turn.
+        
+        Args:
+            max_messages: Maximum number of messages to keep
+            keep_system: Keep a leading system message (it counts towards
+                ``max_messages``)
+                
+        Returns:
+            Number of messages removed
+        """
+        if max_messages < 0:
+            raise ValueError("max_messages must be non-negative")
+        
+        messages = self.messages
+        excess = len(messages) - max_messages
+        if excess <= 0:
+            return 0
+        
+        start = 1 if keep_system and messages[0]["role"] == "system" and max_messages > 0 else 0
+        del messages[start:start + excess]
+        return excess
     
     def get_messages(self) -> List[Dict[str, str]]:
         """Get all messages in the conversation.
@@ -42,6 +157,35 @@ class ConversationHistory:
         """
         return self.messages.copy()
     
+    def messages_view(self) -> "Sequence[Dict[str, str]]":
+        """Get a read-only view of the messages without copying them.
+        
+        The view reflects later additions to the history, so it should be
+        consumed before the conversation continues (as an LLM call does).
+        Use ``get_messages`` for a snapshot.
+        
+        Returns:
+            Sequence of message dictionaries
+        """
+        return _MessagesView(self.messages)
+    
+    def iter_contents(self, role: Optional[str] = None) -> Iterator[str]:
+        """Iterate over message contents without copying the message list.
+        
+        Args:
+            role: Only yield contents of messages with this role, if given
+            
+        Yields:
+            Message contents in conversation order
+        """
+        if role is None:
+            for msg in self.messages:
+                yield msg["content"]
+        else:
+            for msg in self.messages:
+                if msg["role"] == role:
+                    yield msg["content"]
+    
     def get_last_response(self) -> Optional[LLMResponse]:
         """Get the last LLM response.
         
@@ -50,6 +194,14 @@ class ConversationHistory:
         """
         return self.responses[-1] if self.responses else None
     
+    @property
+    def started_at_iso(self) -> str:
+        """ISO 8601 form of ``started_at``, formatted once and reused."""
+        cached = self._started_at_iso
+        if cached is None or cached[0] is not self.started_at:
+            cached = self._started_at_iso = (self.started_at, self.started_at.isoformat())
+        return cached[1]
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert history to dictionary.
         
@@ -60,9 +212,20 @@ class ConversationHistory:
             "messages": self.messages,
             "responses": [r.to_dict() for r in self.responses],
             "metadata": self.metadata,
-            "started_at": self.started_at.isoformat(),
+            "started_at": self.started_at_iso,
             "num_turns": len(self.responses),
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize the history as compact UTF-8 JSON.
+        
+        Returns:
+            JSON encoding of ``to_dict()``
+        """
+        # Lazy, like LLMResponse.to_json, so the JSON backends load on first use
+        from vendingbench.core import _json
+        
+        return _json.dumps(self.to_dict())
 
 
 class ConversationManager:
@@ -94,32 +257,225 @@ class ConversationManager:
         Returns:
             ConversationHistory containing the full conversation
         """
-        history = ConversationHistory()
-        history.metadata["scenario_name"] = scenario.config.name
-        history.metadata["model_name"] = self.llm.model_name
+        history = self._start_history(scenario)
+        self._run_turns(scenario, history, verbose=verbose)
+        return history
+    
+    def run_scenarios_batched(
+        self,
+        scenarios: List[Scenario],
+        batch_size: int = 8,
+        verbose: bool = False,
+    ) -> List[ConversationHistory]:
+        """Run several scenarios, batching their opening turns.
         
-        # Add system prompt if present
-        system_msg = scenario.get_system_message()
-        if system_msg:
-            history.add_message(system_msg["role"], system_msg["content"])
+        The first turn of a scenario does not depend on any earlier model
+        output, so opening user inputs are sent through
+        ``LLMInterface.batch_generate`` in groups of ``batch_size``. The
+        remaining, dependent turns then run sequentially per scenario.
+
+        Whether a group costs one request or one per scenario is up to the
+        adapter. ``OpenAIAdapter`` only packs a group into one request when
+        created with ``pack_batches=True``, which changes the opening turn
+        the model sees; see ``OpenAIAdapter.batch_generate``.
         
-        # Execute each turn
-        for i, turn in enumerate(scenario.turns):
-            if verbose:
-                print(f"Turn {i+1}/{len(scenario.turns)}: {turn.turn_type.value}")
+        Args:
+            scenarios: Scenarios to execute
+            batch_size: Maximum number of opening turns per batched call
+            verbose: Whether to print progress information
             
-            if turn.turn_type == TurnType.USER_INPUT:
-                response = self._execute_user_turn(turn, history, scenario)
-                history.add_response(response)
+        Returns:
+            Conversation histories in the same order as ``scenarios``
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        histories = [self._start_history(scenario) for scenario in scenarios]
+        
+        # Group batchable openers by generation settings
+        groups: Dict[tuple, List[int]] = {}
+        for idx, scenario in enumerate(scenarios):
+            if scenario.turns and scenario.turns[0].turn_type is TurnType.USER_INPUT:
+                key = (scenario.config.temperature, scenario.config.max_tokens)
+                groups.setdefault(key, []).append(idx)
+        
+        for (temperature, max_tokens), indices in groups.items():
+            for start in range(0, len(indices), batch_size):
+                chunk = indices[start:start + batch_size]
+                prompts = []
+                for idx in chunk:
+                    histories[idx].messages.append(scenarios[idx].turns[0].user_message())
+                    prompts.append(histories[idx].messages_view())
                 
-                if verbose:
+                responses = self.llm.batch_generate(
+                    prompts,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                for idx, response in zip(chunk, responses):
+                    histories[idx].add_response(response)
+        
+        batched = {idx for indices in groups.values() for idx in indices}
+        for idx, (scenario, history) in enumerate(zip(scenarios, histories)):
+            start = 1 if idx in batched else 0
+            if verbose:
+                print(f"Scenario {idx+1}/{len(scenarios)}: {scenario.config.name}")
+                if start:
+                    # The opener was answered in a batch; report it like any other turn
+                    turn = scenario.turns[0]
+                    print(f"Turn 1/{len(scenario.turns)}: {turn.turn_type.value}")
                     print(f"  User: {turn.content[:50]}...")
-                    print(f"  Assistant: {response.content[:50]}...")
+                    print(f"  Assistant: {history.responses[0].content[:50]}...")
+            self._run_turns(scenario, history, start=start, verbose=verbose)
+        
+        return histories
+    
+    async def arun_scenario(
+        self,
+        scenario: Scenario,
+        verbose: bool = False
+    ) -> ConversationHistory:
+        """Run a complete scenario with the LLM from a coroutine.
+        
+        Turns within a scenario still run sequentially because each one
+        depends on the previous response, but the LLM calls are awaited so
+        several scenarios can share an event loop (see ``arun_scenarios``).
+        
+        Args:
+            scenario: The scenario to execute
+            verbose: Whether to print progress information
+            
+        Returns:
+            ConversationHistory containing the full conversation
+        """
+        history = self._start_history(scenario)
+        
+        turns = scenario.turns
+        if not verbose:
+            # Only user inputs do any work when nothing is printed
+            execute = self._aexecute_user_turn
+            for i in scenario.user_turn_indices():
+                await execute(turns[i], history, scenario)
+            return history
+        
+        num_turns = len(turns)
+        for i, turn in enumerate(turns):
+            print(f"Turn {i+1}/{num_turns}: {turn.turn_type.value}")
+            
+            if turn.turn_type is TurnType.USER_INPUT:
+                response = await self._aexecute_user_turn(turn, history, scenario)
+                print(f"  User: {turn.content[:50]}...")
+                print(f"  Assistant: {response.content[:50]}...")
+            
+            elif turn.turn_type is TurnType.STATE_CHECK:
+                print(f"  State check: {turn.content[:50]}...")
+        
+        return history
+    
+    async def arun_scenarios(
+        self,
+        scenarios: List[Scenario],
+        verbose: bool = False,
+    ) -> List[ConversationHistory]:
+        """Run several independent scenarios concurrently.
+        
+        Network-bound adapters overlap their request latency, so wall time is
+        bounded by the longest scenario rather than the sum of all of them.
+        
+        Args:
+            scenarios: Scenarios to execute
+            verbose: Whether to print progress information
+            
+        Returns:
+            Conversation histories in the same order as ``scenarios``
+        """
+        return list(await asyncio.gather(
+            *[self.arun_scenario(s, verbose=verbose) for s in scenarios]
+        ))
+    
+    async def _aexecute_user_turn(
+        self,
+        turn,
+        history: ConversationHistory,
+        scenario: Scenario
+    ) -> LLMResponse:
+        """Execute a user input turn from a coroutine and record the response.
+        
+        Args:
+            turn: The conversation turn to execute
+            history: Current conversation history
+            scenario: The scenario being executed
+            
+        Returns:
+            LLM response for this turn
+        """
+        history.messages.append(turn.user_message())
+        response = await self.llm.agenerate(
+            messages=history.messages_view(),
+            temperature=scenario.config.temperature,
+            max_tokens=scenario.config.max_tokens,
+        )
+        history.add_response(response)
+        return response
+    
+    def _run_turns(
+        self,
+        scenario: Scenario,
+        history: ConversationHistory,
+        start: int = 0,
+        verbose: bool = False,
+    ):
+        """Execute the scenario's turns from ``start`` onwards.
+        
+        Args:
+            scenario: The scenario being executed
+            history: Conversation history to append to
+            start: Index of the first turn to execute
+            verbose: Whether to print progress information
+        """
+        turns = scenario.turns
+        generate = _trusted_generate(self.llm)
+        if not verbose:
+            # Only user inputs do any work when nothing is printed
+            execute = self._execute_user_turn
+            add_response = history.add_response
+            for i in scenario.user_turn_indices():
+                if i >= start:
+                    add_response(execute(turns[i], history, scenario, generate))
+            return
+        
+        num_turns = len(turns)
+        for i in range(start, num_turns):
+            turn = turns[i]
+            print(f"Turn {i+1}/{num_turns}: {turn.turn_type.value}")
             
-            elif turn.turn_type == TurnType.STATE_CHECK:
+            if turn.turn_type is TurnType.USER_INPUT:
+                response = self._execute_user_turn(turn, history, scenario, generate)
+                history.add_response(response)
+                print(f"  User: {turn.content[:50]}...")
+                print(f"  Assistant: {response.content[:50]}...")
+            
+            elif turn.turn_type is TurnType.STATE_CHECK:
                 # State checks can optionally query the model
-                if verbose:
-                    print(f"  State check: {turn.content[:50]}...")
+                print(f"  State check: {turn.content[:50]}...")
+    
+    def _start_history(self, scenario: Scenario) -> ConversationHistory:
+        """Create a fresh history for a scenario run.
+        
+        Args:
+            scenario: The scenario about to be executed
+            
+        Returns:
+            ConversationHistory seeded with metadata and the system prompt
+        """
+        history = ConversationHistory()
+        history.metadata["scenario_name"] = sys.intern(scenario.config.name)
+        history.metadata["model_name"] = sys.intern(self.llm.model_name)
+        
+        # Add system prompt if present
+        system_msg = scenario.get_system_message()
+        if system_msg:
+            history.add_message(system_msg["role"], system_msg["content"])
         
         return history
     
@@ -127,7 +483,8 @@ class ConversationManager:
         self,
         turn,
         history: ConversationHistory,
-        scenario: Scenario
+        scenario: Scenario,
+        generate: Optional[Callable[..., LLMResponse]] = None,
     ) -> LLMResponse:
         """Execute a user input turn.
         
@@ -135,16 +492,21 @@ class ConversationManager:
             turn: The conversation turn to execute
             history: Current conversation history
             scenario: The scenario being executed
+            generate: Generate method resolved by ``_trusted_generate`` for
+                this run; resolved here if omitted
             
         Returns:
             LLM response for this turn
         """
-        # Add user message
-        history.add_message("user", turn.content)
+        # Add the turn's prebuilt user message
+        history.messages.append(turn.user_message())
         
-        # Generate response
-        response = self.llm.generate(
-            messages=history.get_messages(),
+        if generate is None:
+            generate = _trusted_generate(self.llm)
+        
+        # Generate response; every message was validated on the way in
+        response = generate(
+            messages=history.messages_view(),
             temperature=scenario.config.temperature,
             max_tokens=scenario.config.max_tokens,
         )
@@ -171,11 +533,70 @@ class ConversationManager:
         """
         history.add_message("user", user_input)
         
+        # The caller's history may hold messages appended directly to
+        # history.messages, so this path keeps the adapter's validation
         response = self.llm.generate(
-            messages=history.get_messages(),
+            messages=history.messages_view(),
             temperature=temperature,
             max_tokens=max_tokens,
         )
         
         history.add_response(response)
         return response
+
+
+@functools.lru_cache(maxsize=None)
+def _skips_validation(cls: Type[LLMInterface]) -> bool:
+    """Check whether ``generate_trusted`` stands in for a class's ``generate``.
+    
+    ``generate_trusted`` only stands in for the ``generate`` of the class
+    that defines it. If a subclass overrides ``generate`` but not
+    ``generate_trusted``, the override is what must be called.
+    
+    Args:
+        cls: LLM interface class
+        
+    Returns:
+        True if ``cls.generate_trusted`` skips validation for ``cls.generate``
+    """
+    owner = next(klass for klass in cls.__mro__ if "generate_trusted" in vars(klass))
+    return getattr(owner, "generate", None) is cls.generate
+
+
+def _trusted_generate(llm: LLMInterface) -> Callable[..., LLMResponse]:
+    """Pick the generate method for messages validated on insert.
+    
+    Resolved at the start of each run, so a ``generate`` replaced on the
+    instance (e.g. by ``mock.patch.object`` or ``monkeypatch``) before the
+    run is called.
+    
+    Args:
+        llm: LLM interface to generate with
+        
+    Returns:
+        ``llm.generate_trusted`` if it skips validation for this LLM's own
+        ``generate``, otherwise ``llm.generate``
+    """
+    if "generate" not in getattr(llm, "__dict__", ()) and _skips_validation(type(llm)):
+        return llm.generate_trusted
+    return llm.generate
+
+
+async def arun_scenarios(
+    manager: ConversationManager,
+    scenarios: List[Scenario],
+    verbose: bool = False,
+) -> List[ConversationHistory]:
+    """Run several independent scenarios concurrently.
+    
+    Equivalent to ``manager.arun_scenarios(scenarios, verbose)``.
+    
+    Args:
+        manager: Conversation manager whose LLM is shared by all scenarios
+        scenarios: Scenarios to execute
+        verbose: Whether to print progress information
+        
+    Returns:
+        Conversation histories in the same order as ``scenarios``
+    """
+    return await manager.arun_scenarios(scenarios, verbose=verbose)
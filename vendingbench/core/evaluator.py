@@ -1,14 +1,19 @@
 """Evaluation and metrics for LLM responses."""
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-import re
+from functools import partial
+import asyncio
+import sys
 
+from vendingbench.core._compat import DATACLASS_SLOTS
 from vendingbench.core.conversation import ConversationHistory
-from vendingbench.core.scenario import Scenario, ConversationTurn
+from vendingbench.core.patterns import pattern_matches
+from vendingbench.core.scenario import Scenario
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class EvaluationMetric:
     """Represents a single evaluation metric."""
     
@@ -27,8 +32,18 @@ class EvaluationMetric:
         }
 
 
-@dataclass
-class EvaluationResult:
+class _EvaluationResultCaches:
+    """Private caches of an EvaluationResult.
+    
+    Declared as slots of a base class rather than dataclass fields so they
+    stay out of ``dataclasses.fields``/``asdict``, ``repr`` and equality.
+    """
+    
+    __slots__ = ("_evaluated_at_iso",)
+
+
+@dataclass(**DATACLASS_SLOTS)
+class EvaluationResult(_EvaluationResultCaches):
     """Results from evaluating a conversation."""
     
     scenario_name: str
@@ -38,6 +53,11 @@ class EvaluationResult:
     evaluated_at: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    def __post_init__(self):
+        """Start with an empty cache."""
+        # (evaluated_at, its ISO string) as of the last evaluated_at_iso lookup
+        self._evaluated_at_iso: Optional[Tuple[datetime, str]] = None
+    
     def add_metric(self, metric: EvaluationMetric):
         """Add a metric to the results.
         
@@ -46,6 +66,11 @@ class EvaluationResult:
         """
         self.metrics.append(metric)
     
+    @property
+    def num_passed(self) -> int:
+        """Number of passed metrics."""
+        return sum(1 for m in self.metrics if m.passed)
+    
     def get_metric(self, name: str) -> Optional[EvaluationMetric]:
         """Get a metric by name.
         
@@ -53,7 +78,7 @@ class EvaluationResult:
             name: Name of the metric
             
         Returns:
-            The metric or None if not found
+            The first metric with that name, or None if not found
         """
         for metric in self.metrics:
             if metric.name == name:
@@ -68,8 +93,15 @@ class EvaluationResult:
         """
         if not self.metrics:
             return 0.0
-        passed_count = sum(1 for m in self.metrics if m.passed)
-        return passed_count / len(self.metrics)
+        return self.num_passed / len(self.metrics)
+    
+    @property
+    def evaluated_at_iso(self) -> str:
+        """ISO 8601 form of ``evaluated_at``, formatted once and reused."""
+        cached = self._evaluated_at_iso
+        if cached is None or cached[0] is not self.evaluated_at:
+            cached = self._evaluated_at_iso = (self.evaluated_at, self.evaluated_at.isoformat())
+        return cached[1]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert result to dictionary.
@@ -83,7 +115,7 @@ class EvaluationResult:
             "metrics": [m.to_dict() for m in self.metrics],
             "overall_passed": self.overall_passed,
             "pass_rate": self.calculate_pass_rate(),
-            "evaluated_at": self.evaluated_at.isoformat(),
+            "evaluated_at": self.evaluated_at_iso,
             "metadata": self.metadata,
         }
     
@@ -104,9 +136,38 @@ class Evaluator:
     and custom validation functions.
     """
     
-    def __init__(self):
-        """Initialize the evaluator."""
+    # Upper bound on validators run concurrently with parallel_validators
+    MAX_VALIDATOR_WORKERS = 8
+    
+    def __init__(self, parallel_validators: bool = False):
+        """Initialize the evaluator.
+        
+        Args:
+            parallel_validators: Run a scenario's synchronous validators on a
+                thread pool instead of one after another. Only worth it for
+                validators that block on I/O, and every validator must then
+                be thread-safe.
+        """
         self.custom_validators: Dict[str, Callable] = {}
+        self.parallel_validators = parallel_validators
+        self._validator_pool: Optional[ThreadPoolExecutor] = None
+    
+    def close(self):
+        """Shut down the validator thread pool, if one was started.
+        
+        The evaluator stays usable; a new pool is started when needed.
+        """
+        pool, self._validator_pool = self._validator_pool, None
+        if pool is not None:
+            pool.shutdown()
+    
+    def __enter__(self) -> "Evaluator":
+        """Use the evaluator as a context manager that closes it on exit."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the evaluator."""
+        self.close()
     
     def register_validator(self, name: str, validator: Callable):
         """Register a custom validator function.
@@ -117,6 +178,22 @@ class Evaluator:
         """
         self.custom_validators[name] = validator
     
+    def specialize(self, scenario: Scenario) -> Callable[[ConversationHistory], EvaluationResult]:
+        """Get an evaluation function bound to one scenario.
+        
+        Prepares the scenario's pattern matcher up front (see
+        ``Scenario.compiled_matcher``), so the first evaluation doesn't pay
+        for compiling its patterns.
+        
+        Args:
+            scenario: Scenario to evaluate against
+            
+        Returns:
+            Callable taking a ConversationHistory and returning its EvaluationResult
+        """
+        scenario.compiled_matcher()
+        return partial(self.evaluate, scenario=scenario)
+    
     def evaluate(
         self,
         history: ConversationHistory,
@@ -143,7 +220,36 @@ class Evaluator:
         self._run_custom_validators(history, scenario, result)
         
         # Calculate overall pass/fail
-        result.overall_passed = all(m.passed for m in result.metrics)
+        result.overall_passed = result.num_passed == len(result.metrics)
+        
+        return result
+    
+    async def aevaluate(
+        self,
+        history: ConversationHistory,
+        scenario: Scenario,
+    ) -> EvaluationResult:
+        """Evaluate a conversation history from a coroutine.
+        
+        Like ``evaluate``, but coroutine validators are awaited on the
+        running event loop. Calling ``evaluate`` from a coroutine instead
+        runs them on a worker thread and blocks the loop until they finish.
+        
+        Args:
+            history: The conversation history to evaluate
+            scenario: The scenario that was executed
+            
+        Returns:
+            EvaluationResult containing metrics and overall pass/fail
+        """
+        result = EvaluationResult(
+            scenario_name=scenario.config.name,
+            model_name=history.metadata.get("model_name", "unknown"),
+        )
+        
+        self._evaluate_patterns(history, scenario, result)
+        self._add_validator_metrics(await self._acall_validators(history, scenario), result)
+        result.overall_passed = result.num_passed == len(result.metrics)
         
         return result
     
@@ -160,40 +266,24 @@ class Evaluator:
             scenario: Scenario with expected patterns
             result: Result object to add metrics to
         """
-        response_idx = 0
+        matches = scenario.compiled_matcher()(history.responses)
+        # Each turn with expected patterns is checked against the next response
+        pattern_turns = [turn for turn in scenario.turns if turn.expected_patterns]
         
-        for turn in scenario.turns:
-            if not turn.expected_patterns:
-                continue
-            
-            if response_idx >= len(history.responses):
-                # Not enough responses
-                metric = EvaluationMetric(
-                    name=f"pattern_match_turn_{response_idx}",
-                    value=0.0,
-                    passed=False,
-                    details={"error": "No response for this turn"},
-                )
-                result.add_metric(metric)
-                continue
-            
-            response = history.responses[response_idx]
+        for response_idx, (turn, flags) in enumerate(zip(pattern_turns, matches)):
             matched_patterns = []
             missing_patterns = []
             
-            for pattern in turn.expected_patterns:
-                if self._pattern_matches(pattern, response.content):
+            for pattern, found in zip(turn.expected_patterns, flags):
+                if found:
                     matched_patterns.append(pattern)
                 else:
                     missing_patterns.append(pattern)
             
-            passed = len(missing_patterns) == 0
-            value = len(matched_patterns) / len(turn.expected_patterns) if turn.expected_patterns else 1.0
-            
             metric = EvaluationMetric(
-                name=f"pattern_match_turn_{response_idx}",
-                value=value,
-                passed=passed,
+                name=sys.intern(f"pattern_match_turn_{response_idx}"),
+                value=len(matched_patterns) / len(turn.expected_patterns),
+                passed=not missing_patterns,
                 details={
                     "matched": matched_patterns,
                     "missing": missing_patterns,
@@ -201,28 +291,30 @@ class Evaluator:
                 },
             )
             result.add_metric(metric)
-            
-            response_idx += 1
+        
+        # Not enough responses for the remaining turns
+        for response_idx in range(len(matches), len(pattern_turns)):
+            metric = EvaluationMetric(
+                name=sys.intern(f"pattern_match_turn_{response_idx}"),
+                value=0.0,
+                passed=False,
+                details={"error": "No response for this turn"},
+            )
+            result.add_metric(metric)
     
-    def _pattern_matches(self, pattern: str, text: str) -> bool:
+    def _pattern_matches(self, pattern: str, text: str, text_lower: Optional[str] = None) -> bool:
         """Check if a pattern matches text.
         
         Args:
             pattern: Pattern to match (can be regex or substring)
             text: Text to search in
-            
+            text_lower: Precomputed ``text.lower()``, shared across the
+                patterns checked against one response
+                
         Returns:
             True if pattern matches
         """
-        # Try as regex first
-        try:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        except re.error:
-            pass
-        
-        # Fall back to case-insensitive substring match
-        return pattern.lower() in text.lower()
+        return pattern_matches(pattern, text, text_lower)
     
     def _run_custom_validators(
         self,
@@ -237,21 +329,163 @@ class Evaluator:
             scenario: Scenario with validators
             result: Result object to add metrics to
         """
-        for i, validator in enumerate(scenario.validators):
-            try:
-                passed = validator(history, scenario)
-                metric = EvaluationMetric(
-                    name=f"custom_validator_{i}",
-                    value=1.0 if passed else 0.0,
-                    passed=passed,
-                    details={"validator_function": validator.__name__ if hasattr(validator, "__name__") else "lambda"},
-                )
-                result.add_metric(metric)
-            except Exception as e:
+        self._add_validator_metrics(self._call_validators(history, scenario), result)
+    
+    @staticmethod
+    def _add_validator_metrics(outcomes: List[Tuple[Any, Any]], result: EvaluationResult):
+        """Add one metric per validator outcome.
+        
+        Args:
+            outcomes: (bound validator, return value or raised exception) pairs
+            result: Result object to add metrics to
+        """
+        for i, (validator, outcome) in enumerate(outcomes):
+            # BaseException: gather hands back CancelledError as an outcome too
+            if isinstance(outcome, BaseException):
                 metric = EvaluationMetric(
-                    name=f"custom_validator_{i}",
+                    name=sys.intern(f"custom_validator_{i}"),
                     value=0.0,
                     passed=False,
-                    details={"error": str(e)},
+                    details={"error": str(outcome)},
+                )
+            else:
+                metric = EvaluationMetric(
+                    name=sys.intern(f"custom_validator_{i}"),
+                    value=1.0 if outcome else 0.0,
+                    passed=outcome,
+                    details={"validator_function": validator.name},
+                )
+            result.add_metric(metric)
+    
+    def _call_validators(
+        self,
+        history: ConversationHistory,
+        scenario: Scenario,
+    ) -> List[Tuple[Any, Any]]:
+        """Call a scenario's validators.
+        
+        Synchronous validators are called in order, or on a thread pool with
+        ``parallel_validators``. Coroutine validators are gathered on one
+        event loop per evaluation, run on this thread unless it already runs
+        a loop, in which case a worker thread runs it and this thread waits
+        (``aevaluate`` awaits them instead).
+        
+        Args:
+            history: Conversation history
+            scenario: Scenario with validators
+            
+        Returns:
+            (bound validator, return value or raised exception) in validator order
+        """
+        validators = scenario.bound_validators()
+        sync_ids = [i for i, v in enumerate(validators) if not v.is_async]
+        async_ids = [i for i, v in enumerate(validators) if v.is_async]
+        outcomes: Dict[int, Any] = {}
+        
+        if self.parallel_validators and len(sync_ids) > 1:
+            pool = self._get_validator_pool()
+            futures = {
+                i: pool.submit(self._call_validator, validators[i].fn, history, scenario)
+                for i in sync_ids
+            }
+        else:
+            futures = {}
+            for i in sync_ids:
+                outcomes[i] = self._call_validator(validators[i].fn, history, scenario)
+        
+        if async_ids:
+            gather = self._gather_validators(
+                [validators[i].fn for i in async_ids], history, scenario
+            )
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                gathered = asyncio.run(gather)
+            else:
+                # asyncio.run can't nest inside a running loop, so use a worker thread
+                gathered = self._get_validator_pool().submit(asyncio.run, gather).result()
+            outcomes.update(zip(async_ids, gathered))
+        
+        for i, future in futures.items():
+            outcomes[i] = future.result()
+        
+        return [(v, outcomes[i]) for i, v in enumerate(validators)]
+    
+    async def _acall_validators(
+        self,
+        history: ConversationHistory,
+        scenario: Scenario,
+    ) -> List[Tuple[Any, Any]]:
+        """Call a scenario's validators from a coroutine.
+        
+        Synchronous validators are called in order, or awaited on the thread
+        pool with ``parallel_validators``; coroutine validators are gathered
+        on the running loop.
+        
+        Args:
+            history: Conversation history
+            scenario: Scenario with validators
+            
+        Returns:
+            (bound validator, return value or raised exception) in validator order
+        """
+        validators = scenario.bound_validators()
+        sync_ids = [i for i, v in enumerate(validators) if not v.is_async]
+        async_ids = [i for i, v in enumerate(validators) if v.is_async]
+        outcomes: Dict[int, Any] = {}
+        
+        if self.parallel_validators and len(sync_ids) > 1:
+            loop = asyncio.get_running_loop()
+            pool = self._get_validator_pool()
+            pending = [
+                loop.run_in_executor(
+                    pool, self._call_validator, validators[i].fn, history, scenario
                 )
-                result.add_metric(metric)
+                for i in sync_ids
+            ]
+        else:
+            pending = []
+            for i in sync_ids:
+                outcomes[i] = self._call_validator(validators[i].fn, history, scenario)
+        
+        if async_ids:
+            gathered = await self._gather_validators(
+                [validators[i].fn for i in async_ids], history, scenario
+            )
+            outcomes.update(zip(async_ids, gathered))
+        
+        if pending:
+            outcomes.update(zip(sync_ids, await asyncio.gather(*pending)))
+        
+        return [(v, outcomes[i]) for i, v in enumerate(validators)]
+    
+    def _get_validator_pool(self) -> ThreadPoolExecutor:
+        """Get the validator thread pool, creating it on first use."""
+        if self._validator_pool is None:
+            self._validator_pool = ThreadPoolExecutor(
+                max_workers=self.MAX_VALIDATOR_WORKERS,
+                thread_name_prefix="vendingbench-validator",
+            )
+        return self._validator_pool
+    
+    @staticmethod
+    def _call_validator(
+        validator: Callable, history: ConversationHistory, scenario: Scenario
+    ) -> Any:
+        """Call one synchronous validator, returning any exception it raises."""
+        try:
+            return validator(history, scenario)
+        except Exception as e:
+            return e
+    
+    @staticmethod
+    async def _gather_validators(
+        validators: List[Callable],
+        history: ConversationHistory,
+        scenario: Scenario,
+    ) -> List[Any]:
+        """Await coroutine validators concurrently, returning any exceptions raised."""
+        return await asyncio.gather(
+            *(v(history, scenario) for v in validators),
+            return_exceptions=True,
+        )
@@ -1,11 +1,18 @@
 """Base interface for LLM adapters."""
+import functools
+import sys
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from vendingbench.core._compat import DATACLASS_SLOTS
 
-@dataclass
+# Roles accepted in chat messages
+_VALID_ROLES = frozenset({"system", "user", "assistant"})
+
+
+@dataclass(**DATACLASS_SLOTS)
 class LLMResponse:
     """Response from an LLM."""
     
@@ -15,6 +22,10 @@ class LLMResponse:
     metadata: Dict[str, Any] = field(default_factory=dict)
     raw_response: Optional[Any] = None
     
+    def __post_init__(self):
+        """Intern the model name, which is shared by every response in a run."""
+        self.model = sys.intern(self.model)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert response to dictionary."""
         return {
@@ -23,6 +34,13 @@ class LLMResponse:
             "timestamp": self.timestamp.isoformat(),
             "metadata": self.metadata,
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize the response as compact UTF-8 JSON (the ``to_dict`` form)."""
+        # Importing _json lazily keeps orjson/msgspec off every adapter's import path
+        from vendingbench.core import _json
+        
+        return _json.dumps(self.to_dict())
 
 
 class LLMInterface(ABC):
@@ -45,15 +63,20 @@ class LLMInterface(ABC):
     @abstractmethod
     def generate(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Mapping[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         **kwargs
     ) -> LLMResponse:
         """Generate a response from the LLM.
         
+        ``messages`` may be any sequence, including the read-only view
+        ``ConversationManager`` passes from ``ConversationHistory.messages_view``.
+        Adapters must not modify it, and should call ``list(messages)`` if
+        they need list methods.
+        
         Args:
-            messages: List of message dictionaries with 'role' and 'content' keys
+            messages: Sequence of message dictionaries with 'role' and 'content' keys
             temperature: Sampling temperature for generation
             max_tokens: Maximum number of tokens to generate
             **kwargs: Additional provider-specific parameters
@@ -63,10 +86,101 @@ class LLMInterface(ABC):
         """
         pass
     
+    def generate_trusted(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Generate a response from messages that are already known to be valid.
+        
+        Callers such as ``ConversationManager`` validate each message once
+        when it is added to a ``ConversationHistory``, so adapters can skip
+        re-validating the whole conversation on every call. The default
+        implementation simply calls ``generate``; adapters that validate in
+        ``generate`` should override this.
+        
+        Args:
+            messages: Sequence of valid message dictionaries
+            temperature: Sampling temperature for generation
+            max_tokens: Maximum number of tokens to generate
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            LLMResponse object containing the generated content and metadata
+        """
+        return self.generate(messages, temperature, max_tokens, **kwargs)
+    
+    async def agenerate(
+        self,
+        messages: Sequence[Mapping[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Asynchronously generate a response from the LLM.
+        
+        The default implementation runs ``generate`` in the event loop's
+        default executor so blocking adapters do not stall other coroutines.
+        Adapters with a native async client should override this.
+        
+        Args:
+            messages: Sequence of message dictionaries with 'role' and 'content' keys
+            temperature: Sampling temperature for generation
+            max_tokens: Maximum number of tokens to generate
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            LLMResponse object containing the generated content and metadata
+        """
+        # asyncio is only needed here; importing it lazily keeps it off the
+        # import path of purely synchronous adapters
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.generate,
+                messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs
+            ),
+        )
+    
+    def batch_generate(
+        self,
+        prompts: Sequence[Sequence[Mapping[str, str]]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> List[LLMResponse]:
+        """Generate responses for several independent conversations.
+        
+        The default implementation calls ``generate`` once per prompt.
+        Adapters that can answer several prompts in one request should
+        override this.
+        
+        Args:
+            prompts: Sequence of message lists, one per independent conversation
+            temperature: Sampling temperature for generation
+            max_tokens: Maximum number of tokens to generate
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            One LLMResponse per prompt, in the same order
+        """
+        return [
+            self.generate(messages, temperature=temperature, max_tokens=max_tokens, **kwargs)
+            for messages in prompts
+        ]
+    
     @abstractmethod
     def generate_stream(
         self,
-        messages: List[Dict[str, str]],
+        messages: Sequence[Mapping[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         **kwargs
@@ -74,7 +188,7 @@ class LLMInterface(ABC):
         """Generate a streaming response from the LLM.
         
         Args:
-            messages: List of message dictionaries with 'role' and 'content' keys
+            messages: Sequence of message dictionaries with 'role' and 'content' keys
             temperature: Sampling temperature for generation
             max_tokens: Maximum number of tokens to generate
             **kwargs: Additional provider-specific parameters
@@ -95,11 +209,11 @@ class LLMInterface(ABC):
             "config": self.config,
         }
     
-    def validate_messages(self, messages: List[Dict[str, str]]) -> bool:
+    def validate_messages(self, messages: Sequence[Mapping[str, str]]) -> bool:
         """Validate message format.
         
         Args:
-            messages: List of message dictionaries
+            messages: Sequence of message dictionaries
             
         Returns:
             True if messages are valid, False otherwise
@@ -107,12 +221,18 @@ class LLMInterface(ABC):
         if not messages:
             return False
         
-        for msg in messages:
-            if not isinstance(msg, dict):
-                return False
-            if "role" not in msg or "content" not in msg:
-                return False
-            if msg["role"] not in ["system", "user", "assistant"]:
-                return False
+        valid_roles = _VALID_ROLES
+        try:
+            for msg in messages:
+                # Exact-dict check first: isinstance against the Mapping ABC is slow
+                if (
+                    (type(msg) is not dict and not isinstance(msg, Mapping))
+                    or msg.get("role") not in valid_roles
+                    or not isinstance(msg.get("content"), str)
+                ):
+                    return False
+        except TypeError:
+            # Unhashable role
+            return False
         
         return True
@@ -0,0 +1,170 @@
+"""Pattern compilation helpers shared by scenarios and the evaluator."""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Pattern, Sequence, Tuple, cast
+
+from vendingbench.core._compat import DATACLASS_SLOTS
+from vendingbench.core._regex import compile_caseless, lowers_like_re
+
+
+# Characters that give a pattern regex meaning; anything else is a literal
+_REGEX_META = frozenset(".^$*+?()[]{}|\\")
+
+
+def is_literal(pattern: str) -> bool:
+    """Check whether a pattern contains no regex metacharacters.
+    
+    A literal's regex match is the same as a case-insensitive substring
+    match, so literals only need the regex engine for the few characters
+    ``str.lower()`` folds differently from ``re`` (see
+    ``_regex.lowers_like_re``).
+    
+    Args:
+        pattern: Pattern string
+        
+    Returns:
+        True if the pattern is a plain literal
+    """
+    return _REGEX_META.isdisjoint(pattern)
+
+
+@lru_cache(maxsize=4096)
+def compile_pattern(pattern: str) -> Optional[Pattern]:
+    """Compile an expected pattern as a case-insensitive regex.
+    
+    Results are cached, so each distinct pattern is only parsed once per
+    process regardless of how many responses it is checked against. When
+    the ``pcre2`` or ``regex`` extra is installed the returned object comes
+    from that backend (see ``vendingbench.core._regex``); it offers the
+    same ``search`` method as a ``re`` pattern.
+    
+    Args:
+        pattern: Pattern string (regex or plain substring)
+        
+    Returns:
+        Compiled pattern, or None if the pattern is not a valid regex
+    """
+    try:
+        # Backend patterns are not re.Pattern instances but share its search
+        return cast(Pattern, compile_caseless(pattern))
+    except re.error:
+        return None
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class CompiledPattern:
+    """An expected pattern prepared for matching.
+    
+    Literal patterns keep no regex: their regex match is the same as the
+    case-insensitive substring check, which is answered by ``str``'s
+    C-level search. Only texts that ``str.lower()`` folds differently from
+    ``re`` are searched with the literal's (cached) regex.
+    """
+    
+    pattern: str
+    lowered: str
+    regex: Optional[Pattern] = None
+    literal: bool = False
+    
+    def matches(self, text: str, text_lower: Optional[str] = None) -> bool:
+        """Check whether the pattern matches a text.
+        
+        Args:
+            text: Text to search in
+            text_lower: Precomputed ``text.lower()``, if already available
+            
+        Returns:
+            True if the pattern appears as a substring or its regex matches
+        """
+        if text_lower is None:
+            text_lower = text.lower()
+        if self.lowered in text_lower:
+            return True
+        regex = self.regex
+        if self.literal:
+            if lowers_like_re(text):
+                return False
+            regex = compile_pattern(self.pattern)
+        return regex is not None and regex.search(text) is not None
+
+
+@lru_cache(maxsize=4096)
+def prepare_pattern(pattern: str) -> CompiledPattern:
+    """Classify and compile an expected pattern once.
+    
+    Args:
+        pattern: Pattern string (regex or plain substring)
+        
+    Returns:
+        Cached CompiledPattern for ``pattern``
+    """
+    if is_literal(pattern) and lowers_like_re(pattern):
+        return CompiledPattern(pattern, pattern.lower(), literal=True)
+    return CompiledPattern(pattern, pattern.lower(), compile_pattern(pattern))
+
+
+def pattern_matches(pattern: str, text: str, text_lower: Optional[str] = None) -> bool:
+    """Check if a pattern matches text.
+    
+    A pattern matches if it is a valid regex found in the text, or if it
+    appears as a case-insensitive substring.
+    
+    Args:
+        pattern: Pattern to match (can be regex or substring)
+        text: Text to search in
+        text_lower: Precomputed ``text.lower()``, if already available
+        
+    Returns:
+        True if pattern matches
+    """
+    return prepare_pattern(pattern).matches(text, text_lower)
+
+
+def build_matcher(
+    turn_patterns: Sequence[Sequence[str]],
+) -> Callable[[Sequence[Any]], List[Tuple[bool, ...]]]:
+    """Build a matcher for a fixed sequence of pattern turns.
+    
+    Each turn's patterns are resolved to their cached ``CompiledPattern``
+    once, so matching a response only lowercases its text and runs the
+    checks.
+    
+    Args:
+        turn_patterns: Expected patterns of each turn, in response order
+        
+    Returns:
+        Function taking a sequence of responses (anything with ``.content``)
+        and returning one tuple of match flags per turn that has a response
+    """
+    turns = [tuple(prepare_pattern(p) for p in patterns) for patterns in turn_patterns]
+    
+    def match(responses: Sequence[Any]) -> List[Tuple[bool, ...]]:
+        out = []
+        for checks, response in zip(turns, responses):
+            # Responses without content (tool calls, refusals) match like empty replies
+            text = response.content or ""
+            lowered = text.lower()
+            out.append(tuple(check.matches(text, lowered) for check in checks))
+        return out
+    
+    return match
+
+
+@lru_cache(maxsize=256)
+def prepare_matcher(
+    turn_patterns: Tuple[Tuple[str, ...], ...],
+) -> Callable[[Sequence[Any]], List[Tuple[bool, ...]]]:
+    """Get a shared matcher for a fixed sequence of pattern turns.
+    
+    Matchers are cached by their turn patterns and shared by scenarios with
+    the same expectations; a matcher holds no state and is safe to call
+    from several threads.
+    
+    Args:
+        turn_patterns: Expected patterns of each turn, in response order
+        
+    Returns:
+        Cached ``build_matcher`` function for ``turn_patterns``
+    """
+    return build_matcher(turn_patterns)
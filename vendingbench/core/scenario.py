@@ -1,8 +1,13 @@
 """Scenario and test case management."""
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from enum import Enum
 from datetime import datetime
+import inspect
+import sys
+
+from vendingbench.core._compat import DATACLASS_SLOTS
+from vendingbench.core.patterns import prepare_matcher
 
 
 class TurnType(Enum):
@@ -13,7 +18,7 @@ class TurnType(Enum):
     STATE_CHECK = "state_check"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ConversationTurn:
     """Represents a single turn in a conversation scenario."""
     
@@ -22,6 +27,21 @@ class ConversationTurn:
     expected_patterns: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    def __post_init__(self):
+        """Intern the expected patterns, which repeat across turns and scenarios."""
+        # A new list, so the caller's list is left as it was passed in
+        self.expected_patterns = [
+            sys.intern(p) if type(p) is str else p for p in self.expected_patterns
+        ]
+    
+    def user_message(self) -> Dict[str, str]:
+        """Get this turn's content as a new user message.
+        
+        Returns:
+            Message dict with 'role' and 'content' keys, owned by the caller
+        """
+        return {"role": "user", "content": self.content}
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert turn to dictionary."""
         return {
@@ -32,7 +52,7 @@ class ConversationTurn:
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ScenarioConfig:
     """Configuration for a test scenario."""
     
@@ -57,6 +77,20 @@ class ScenarioConfig:
         }
 
 
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class _BoundValidator:
+    """A scenario validator with the facts the evaluator needs looked up once."""
+    
+    fn: Callable
+    name: str
+    is_async: bool
+    
+    @classmethod
+    def bind(cls, fn: Callable) -> "_BoundValidator":
+        """Wrap a validator callable."""
+        return cls(fn, getattr(fn, "__name__", "lambda"), inspect.iscoroutinefunction(fn))
+
+
 class Scenario:
     """Represents a test scenario for evaluating LLM coherence.
     
@@ -75,6 +109,13 @@ class Scenario:
         self.turns: List[ConversationTurn] = []
         self.validators: List[Callable] = []
         self.created_at = datetime.now()
+        self._matcher: Optional[Tuple[Tuple[Tuple[str, ...], ...], Callable]] = None
+        self._user_turn_indices: Optional[List[int]] = None
+        self._user_turn_count = 0
+        self._bound_validators: Optional[
+            Tuple[Tuple[Callable, ...], Tuple[_BoundValidator, ...]]
+        ] = None
+        self._frozen = False
     
     def add_turn(self, turn: ConversationTurn) -> "Scenario":
         """Add a conversation turn to the scenario.
@@ -84,8 +125,13 @@ class Scenario:
             
         Returns:
             Self for method chaining
+            
+        Raises:
+            RuntimeError: If the scenario has been frozen
         """
+        self._check_not_frozen()
         self.turns.append(turn)
+        self._user_turn_indices = None
         return self
     
     def add_user_input(
@@ -144,10 +190,98 @@ class Scenario:
             
         Returns:
             Self for method chaining
+            
+        Raises:
+            RuntimeError: If the scenario has been frozen
         """
+        self._check_not_frozen()
         self.validators.append(validator)
         return self
     
+    def freeze(self) -> "Scenario":
+        """Precompute everything needed to run and evaluate the scenario.
+        
+        Prepares the matcher, binds the validators and indexes the user
+        turns. Afterwards the scenario must not change: ``add_turn`` and
+        ``add_validator`` raise, and ``compiled_matcher`` returns the matcher
+        without re-checking the turns, so evaluating the scenario many times
+        does no rebuild checks.
+        
+        Returns:
+            Self for method chaining
+        """
+        if not self._frozen:
+            self.compiled_matcher()
+            self.user_turn_indices()
+            self.bound_validators()
+            self._frozen = True
+        return self
+    
+    def bound_validators(self) -> Tuple["_BoundValidator", ...]:
+        """Get the validators with their names and kinds resolved.
+        
+        The bindings are cached and rebuilt only if ``validators`` has
+        changed since the last call.
+        
+        Returns:
+            One bound validator per entry of ``validators``, in order
+        """
+        cached = self._bound_validators
+        if cached is None or (not self._frozen and cached[0] != tuple(self.validators)):
+            key = tuple(self.validators)
+            cached = self._bound_validators = (key, tuple(_BoundValidator.bind(v) for v in key))
+        return cached[1]
+    
+    @property
+    def frozen(self) -> bool:
+        """Whether ``freeze`` has been called."""
+        return self._frozen
+    
+    def _check_not_frozen(self):
+        """Raise if the scenario can no longer be modified."""
+        if self._frozen:
+            raise RuntimeError(f"Scenario '{self.config.name}' is frozen")
+    
+    def user_turn_indices(self) -> List[int]:
+        """Get the indices of the turns that send user input to the model.
+        
+        The list is cached and reset by ``add_turn``; it is also rebuilt if
+        ``turns`` changed length in place.
+        
+        Returns:
+            Indices into ``turns`` of every USER_INPUT turn, in order
+        """
+        indices = self._user_turn_indices
+        if indices is None or self._user_turn_count != len(self.turns):
+            user_input = TurnType.USER_INPUT
+            indices = self._user_turn_indices = [
+                i for i, turn in enumerate(self.turns)
+                if turn.turn_type is user_input
+            ]
+            self._user_turn_count = len(self.turns)
+        return indices
+    
+    def compiled_matcher(self) -> Callable:
+        """Get a matcher specialized to this scenario's expected patterns.
+        
+        Turns without expected patterns are skipped, so the i-th tuple
+        returned by the matcher corresponds to the i-th response. The matcher
+        is cached and only looked up again if the turns' expected patterns
+        have changed since the last call; frozen scenarios skip the check.
+        It is shared with scenarios that have the same turn patterns (see
+        ``prepare_matcher``).
+        
+        Returns:
+            Function mapping a list of responses to per-turn match flags
+        """
+        cached = self._matcher
+        if cached is not None and self._frozen:
+            return cached[1]
+        key = tuple(tuple(turn.expected_patterns) for turn in self.turns if turn.expected_patterns)
+        if cached is None or cached[0] != key:
+            cached = self._matcher = (key, prepare_matcher(key))
+        return cached[1]
+    
     def get_system_message(self) -> Optional[Dict[str, str]]:
         """Get the system message for this scenario.
         
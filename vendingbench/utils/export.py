@@ -1,13 +1,100 @@
 """Export utilities for saving results."""
 import json
+import mmap
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Union, List
 from datetime import datetime
 
+from vendingbench.core import _json
 from vendingbench.core.evaluator import EvaluationResult
 from vendingbench.core.conversation import ConversationHistory
 
 
+# O_DIRECT requires buffer, offset and length aligned to the block size
+_DIRECT_IO_ALIGNMENT = 4096
+
+# Upper bound on files written concurrently by save_batch_results
+MAX_WRITE_WORKERS = 32
+
+
+def _dumps(obj) -> bytes:
+    """Serialize an object to two-space indented UTF-8 JSON.
+    
+    Args:
+        obj: JSON-serializable object
+        
+    Returns:
+        Encoded JSON document
+    """
+    return _json.dumps(obj, indent=True)
+
+
+def _fast_io_enabled() -> bool:
+    """Whether the O_DIRECT write path is enabled (Linux, VENDINGBENCH_FAST_IO set)."""
+    return (
+        sys.platform == "linux"
+        and hasattr(os, "O_DIRECT")
+        and bool(os.environ.get("VENDINGBENCH_FAST_IO"))
+    )
+
+
+def _write_direct(path: Path, data: bytes):
+    """Write bytes with O_DIRECT, bypassing the page cache, then fsync.
+    
+    The data is copied into a page-aligned anonymous mmap padded to
+    ``_DIRECT_IO_ALIGNMENT``, written in one call and truncated back to its
+    real length.
+    
+    Args:
+        path: Destination file
+        data: Bytes to write
+        
+    Raises:
+        OSError: If the filesystem rejects O_DIRECT or the write fails
+    """
+    size = len(data)
+    padded = max(-(-size // _DIRECT_IO_ALIGNMENT) * _DIRECT_IO_ALIGNMENT, _DIRECT_IO_ALIGNMENT)
+    
+    with mmap.mmap(-1, padded) as buf:
+        buf.write(data)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+        try:
+            view = memoryview(buf)
+            offset = 0
+            while offset < padded:
+                offset += os.write(fd, view[offset:])
+            view.release()
+            os.ftruncate(fd, size)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _write_bytes(path: Path, data: bytes):
+    """Write bytes to a file.
+    
+    Uses ``_write_direct`` when VENDINGBENCH_FAST_IO is set on Linux and
+    falls back to a buffered write if the filesystem rejects O_DIRECT
+    (e.g. tmpfs).
+    
+    Args:
+        path: Destination file
+        data: Bytes to write
+    """
+    if _fast_io_enabled():
+        try:
+            _write_direct(path, data)
+            return
+        except OSError:
+            pass
+    
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
 def save_evaluation_result(
     result: EvaluationResult,
     output_path: Union[str, Path],
@@ -21,8 +108,7 @@ def save_evaluation_result(
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result.to_dict(), f, indent=2)
+    _write_bytes(output_path, _dumps(result.to_dict()))
 
 
 def save_conversation_history(
@@ -38,8 +124,7 @@ def save_conversation_history(
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(history.to_dict(), f, indent=2)
+    _write_bytes(output_path, _dumps(history.to_dict()))
 
 
 def save_batch_results(
@@ -49,6 +134,9 @@ def save_batch_results(
 ):
     """Save multiple evaluation results to a directory.
     
+    Each result is written to its own file, using a thread pool so the
+    writes overlap, followed by a summary file embedding all of them.
+    
     Args:
         results: List of EvaluationResult objects
         output_dir: Directory to save results
@@ -59,22 +147,33 @@ def save_batch_results(
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Save individual results
-    for i, result in enumerate(results):
-        filename = f"{filename_prefix}_{i}_{timestamp}.json"
-        save_evaluation_result(result, output_dir / filename)
+    # Convert each result once; the dicts feed both the files and the summary
+    dicts = [r.to_dict() for r in results]
+    
+    # Encode every file up front, then overlap the writes (output_dir
+    # already exists, so no per-file mkdir)
+    files = [
+        (output_dir / f"{filename_prefix}_{i}_{timestamp}.json", _dumps(data))
+        for i, data in enumerate(dicts)
+    ]
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_WRITE_WORKERS, len(files))) as pool:
+            # Consume the results so a failed write raises here
+            list(pool.map(lambda item: _write_bytes(*item), files))
+    else:
+        for path, data in files:
+            _write_bytes(path, data)
     
     # Save summary
     summary = {
         "timestamp": timestamp,
         "num_results": len(results),
-        "results": [r.to_dict() for r in results],
-        "aggregate_pass_rate": sum(r.calculate_pass_rate() for r in results) / len(results) if results else 0.0,
+        "results": dicts,
+        "aggregate_pass_rate": sum(d["pass_rate"] for d in dicts) / len(dicts) if dicts else 0.0,
     }
     
     summary_path = output_dir / f"{filename_prefix}_summary_{timestamp}.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2)
+    _write_bytes(summary_path, _dumps(summary))
 
 
 def load_evaluation_result(input_path: Union[str, Path]) -> dict:
@@ -11,6 +11,11 @@ def setup_logger(
 ) -> logging.Logger:
     """Set up a logger for vendingbench.
     
+    Handlers write synchronously, so log lines stay in order with ``print``
+    output. Pass arguments for lazy ``%`` formatting, e.g.
+    ``logger.debug("scenario %s", name)``, rather than pre-formatting
+    messages with f-strings, so filtered-out records cost nothing to build.
+    
     Args:
         name: Name of the logger
         level: Logging level